@@ -1,22 +1,30 @@
 """
 Audit logging API endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 import logging
 
 try:
-    from models.schemas import AuditLog
+    from models.schemas import AuditLog, AuditLogExport
     from core.audit import AuditLogger
+    from core.dependencies import get_audit_logger
+    from core.repo_utils import normalize_repository
 except ImportError:
-    from ..models.schemas import AuditLog
+    from ..models.schemas import AuditLog, AuditLogExport
     from ..core.audit import AuditLogger
+    from ..core.dependencies import get_audit_logger
+    from ..core.repo_utils import normalize_repository
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-audit_logger = AuditLogger()
+# Logs come from our own storage, so responses are dumped straight to JSON
+# rather than re-validated against response_model (kept for the OpenAPI schema)
+_audit_log_list = TypeAdapter(List[AuditLog])
 
 
 @router.get("/logs", response_model=List[AuditLog])
@@ -24,9 +32,12 @@ async def get_audit_logs(
     repository: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    limit: int = Query(100, le=1000)
+    limit: int = Query(100, le=1000),
+    audit_logger: AuditLogger = Depends(get_audit_logger)
 ):
     """Get audit logs with filtering"""
+    if repository:
+        repository = normalize_repository(repository)
     try:
         logs = await audit_logger.get_logs(
             repository=repository,
@@ -34,20 +45,40 @@ async def get_audit_logs(
             end_date=end_date,
             limit=limit
         )
-        return logs
+        return Response(content=_audit_log_list.dump_json(logs), media_type="application/json")
     except Exception as e:
         logger.error(f"Failed to get audit logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/logs/export")
+@router.get(
+    "/logs/export",
+    response_model=AuditLogExport,
+    responses={200: {
+        "description": "JSON export, or a CSV file when format=csv",
+        "content": {"text/csv": {"schema": {"type": "string"}}}
+    }}
+)
 async def export_audit_logs(
     repository: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    format: str = Query("json", regex="^(json|csv)$")
+    format: str = Query("json", regex="^(json|csv)$"),
+    audit_logger: AuditLogger = Depends(get_audit_logger)
 ):
     """Export audit logs"""
+    if repository:
+        repository = normalize_repository(repository)
+    if format == "csv":
+        return StreamingResponse(
+            audit_logger.iter_csv(
+                repository=repository,
+                start_date=start_date,
+                end_date=end_date
+            ),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=audit_logs.csv"}
+        )
     try:
         export_data = await audit_logger.export_logs(
             repository=repository,
@@ -55,7 +86,7 @@ async def export_audit_logs(
             end_date=end_date,
             format=format
         )
-        return export_data
+        return Response(content=export_data.model_dump_json(), media_type="application/json")
     except Exception as e:
         logger.error(f"Failed to export audit logs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,36 +1,74 @@
 """
 Dashboard and reporting API endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
+from typing import Optional, Tuple, Hashable, Callable, Awaitable, Dict, Any
 from datetime import datetime
+from pydantic_core import to_json
+import hashlib
+import time
 import logging
 
 try:
     from core.dashboard import DashboardService
+    from core.dashboard_cache import dashboard_cache
+    from core.dependencies import get_dashboard_service
+    from core.repo_utils import normalize_repository
 except ImportError:
     from ..core.dashboard import DashboardService
+    from ..core.dashboard_cache import dashboard_cache
+    from ..core.dependencies import get_dashboard_service
+    from ..core.repo_utils import normalize_repository
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-dashboard_service = DashboardService()
+
+async def _cached_response(
+    request: Request,
+    cache_key: Tuple[Hashable, ...],
+    compute: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Response:
+    """Serve serialized JSON from the dashboard cache, computing it on a miss
+
+    Responses carry an ETag of the body; pollers that send it back in
+    If-None-Match get an empty 304 while the data is unchanged.
+    """
+    cached = dashboard_cache.get(cache_key)
+    if cached is None:
+        body = to_json(await compute())
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        cached = (body, etag)
+        dashboard_cache.set(cache_key, cached)
+    
+    body, etag = cached
+    headers = {"ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/stats")
 async def get_dashboard_stats(
+    request: Request,
     repository: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
-    end_date: Optional[datetime] = Query(None)
+    end_date: Optional[datetime] = Query(None),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
 ):
     """Get dashboard statistics"""
+    if repository:
+        repository = normalize_repository(repository)
     try:
-        stats = await dashboard_service.get_stats(
-            repository=repository,
-            start_date=start_date,
-            end_date=end_date
+        return await _cached_response(
+            request,
+            ("stats", repository, start_date, end_date),
+            lambda: dashboard_service.get_stats(
+                repository=repository,
+                start_date=start_date,
+                end_date=end_date
+            )
         )
-        return stats
     except Exception as e:
         logger.error(f"Failed to get dashboard stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -38,16 +76,24 @@ async def get_dashboard_stats(
 
 @router.get("/violations/trends")
 async def get_violation_trends(
+    request: Request,
     repository: Optional[str] = Query(None),
-    days: int = Query(30, le=365)
+    days: int = Query(30, le=365),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
 ):
     """Get violation trends over time"""
+    if repository:
+        repository = normalize_repository(repository)
     try:
-        trends = await dashboard_service.get_violation_trends(
-            repository=repository,
-            days=days
+        # The trend window slides with the clock; bucket it to the current minute
+        return await _cached_response(
+            request,
+            ("trends", repository, days, int(time.time() // 60)),
+            lambda: dashboard_service.get_violation_trends(
+                repository=repository,
+                days=days
+            )
         )
-        return trends
     except Exception as e:
         logger.error(f"Failed to get violation trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -55,12 +101,43 @@ async def get_violation_trends(
 
 @router.get("/copilot/insights")
 async def get_copilot_insights(
-    repository: Optional[str] = Query(None)
+    request: Request,
+    repository: Optional[str] = Query(None),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
 ):
     """Get Copilot-related insights"""
+    if repository:
+        repository = normalize_repository(repository)
     try:
-        insights = await dashboard_service.get_copilot_insights(repository)
-        return insights
+        return await _cached_response(
+            request,
+            ("copilot_insights", repository),
+            lambda: dashboard_service.get_copilot_insights(repository)
+        )
     except Exception as e:
         logger.error(f"Failed to get Copilot insights: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/bundle")
+async def get_dashboard_bundle(
+    request: Request,
+    repository: Optional[str] = Query(None),
+    days: int = Query(30, le=365),
+    dashboard_service: DashboardService = Depends(get_dashboard_service)
+):
+    """Get stats, violation trends and Copilot insights in one response"""
+    if repository:
+        repository = normalize_repository(repository)
+    try:
+        return await _cached_response(
+            request,
+            ("bundle", repository, days, int(time.time() // 60)),
+            lambda: dashboard_service.get_dashboard_bundle(
+                repository=repository,
+                days=days
+            )
+        )
+    except Exception as e:
+        logger.error(f"Failed to get dashboard bundle: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
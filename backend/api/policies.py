@@ -1,25 +1,31 @@
 """
 Policy management API endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any
 import logging
 
 try:
     from models.schemas import PolicyConfig
     from engines.policy_engine import PolicyEngine
+    from core.dependencies import get_policy_engine
 except ImportError:
     from ..models.schemas import PolicyConfig
     from ..engines.policy_engine import PolicyEngine
+    from ..core.dependencies import get_policy_engine
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-policy_engine = PolicyEngine()
+
+@router.get("/rule-packs")
+async def list_rule_packs(policy_engine: PolicyEngine = Depends(get_policy_engine)):
+    """List available rule packs"""
+    return policy_engine.rule_packs_summary
 
 
 @router.get("/{repository}", response_model=PolicyConfig)
-async def get_policy(repository: str):
+async def get_policy(repository: str, policy_engine: PolicyEngine = Depends(get_policy_engine)):
     """Get policy configuration for a repository"""
     try:
         policy = policy_engine.get_policy(repository)
@@ -30,7 +36,11 @@ async def get_policy(repository: str):
 
 
 @router.put("/{repository}", response_model=PolicyConfig)
-async def update_policy(repository: str, policy: PolicyConfig):
+async def update_policy(
+    repository: str,
+    policy: PolicyConfig,
+    policy_engine: PolicyEngine = Depends(get_policy_engine)
+):
     """Update policy configuration for a repository"""
     try:
         # In production, this would save to database or file system
@@ -39,19 +49,3 @@ async def update_policy(repository: str, policy: PolicyConfig):
     except Exception as e:
         logger.error(f"Failed to update policy for {repository}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/rule-packs")
-async def list_rule_packs():
-    """List available rule packs"""
-    return {
-        "rule_packs": list(policy_engine.rule_packs.keys()),
-        "details": {
-            name: {
-                "name": pack.get("name", name),
-                "description": pack.get("description", ""),
-                "rules_count": len(pack.get("rules", []))
-            }
-            for name, pack in policy_engine.rule_packs.items()
-        }
-    }
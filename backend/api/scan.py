@@ -1,7 +1,7 @@
 """
 Scan API endpoints
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from typing import List
 import logging
 
@@ -9,20 +9,24 @@ try:
     from models.schemas import ScanRequest, ScanResult
     from core.scanner import CodeScanner
     from core.audit import AuditLogger
+    from core.dependencies import get_audit_logger, get_code_scanner
 except ImportError:
     from ..models.schemas import ScanRequest, ScanResult
     from ..core.scanner import CodeScanner
     from ..core.audit import AuditLogger
+    from ..core.dependencies import get_audit_logger, get_code_scanner
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-scanner = CodeScanner()
-audit_logger = AuditLogger()
-
 
 @router.post("/", response_model=ScanResult)
-async def scan_code(request: ScanRequest, background_tasks: BackgroundTasks):
+async def scan_code(
+    request: ScanRequest,
+    background_tasks: BackgroundTasks,
+    scanner: CodeScanner = Depends(get_code_scanner),
+    audit_logger: AuditLogger = Depends(get_audit_logger)
+):
     """Scan code for violations"""
     try:
         result = await scanner.scan(request)
@@ -1,36 +1,233 @@
 """
 Audit logging system
 """
-import uuid
+import asyncio
+import bisect
+import csv
+import io
+import json
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import sys
+from collections import defaultdict
+from datetime import datetime, date, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+import aiofiles
 try:
-    from models.schemas import AuditLog, ScanResult, ScanRequest, EnforcementMode
+    from models.schemas import AuditLog, AuditLogExport, ScanResult, ScanRequest, EnforcementMode
     from core.config import settings
+    from core.audit_stats import DAILY_STAT_FIELDS, accumulate_daily_stats
+    from core.dashboard_cache import dashboard_cache
+    from core.ids import uuid7
+    from core.repo_utils import normalize_repository
 except ImportError:
-    from ..models.schemas import AuditLog, ScanResult, ScanRequest, EnforcementMode
+    from ..models.schemas import AuditLog, AuditLogExport, ScanResult, ScanRequest, EnforcementMode
     from ..core.config import settings
+    from ..core.audit_stats import DAILY_STAT_FIELDS, accumulate_daily_stats
+    from ..core.dashboard_cache import dashboard_cache
+    from ..core.ids import uuid7
+    from ..core.repo_utils import normalize_repository
+
+try:
+    from core.audit_store import SQLAuditStore
+except ImportError:
+    try:
+        from .audit_store import SQLAuditStore
+    except ImportError:
+        # SQLAlchemy is optional; without it only in-memory storage is available
+        SQLAuditStore = None
 
 logger = logging.getLogger(__name__)
 
 
+def _epoch_us(value: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _insert_sorted(timestamps: List[int], logs: List[AuditLog], timestamp: int, log_entry: AuditLog):
+    """Add an entry to a pair of timestamp-sorted lists"""
+    if not timestamps or timestamp >= timestamps[-1]:
+        timestamps.append(timestamp)
+        logs.append(log_entry)
+    else:
+        # Out-of-order entry (e.g. a hand-edited log file)
+        position = bisect.bisect_right(timestamps, timestamp)
+        timestamps.insert(position, timestamp)
+        logs.insert(position, log_entry)
+
+
+def _csv_row(log: AuditLog) -> tuple:
+    """Field values in CSV_HEADER order"""
+    return (
+        log.log_id, log.timestamp.isoformat(), log.repository, log.action,
+        log.violations_count, log.enforcement_action.value, log.resolved
+    )
+
+
+# Audit writes are coalesced: up to FLUSH_BATCH_SIZE entries, or whatever
+# arrived within FLUSH_LINGER_SECONDS of the first one, go out together
+FLUSH_BATCH_SIZE = 256
+FLUSH_LINGER_SECONDS = 0.05
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+CSV_HEADER = ("log_id", "timestamp", "repository", "action", "violations_count", "enforcement_action", "resolved")
+
+
 class AuditLogger:
     """Audit logging service"""
     
     def __init__(self):
-        # In production, this would use a database
-        # For now, we'll use in-memory storage
+        # In-memory storage unless AUDIT_DATABASE_URL points at a database
         self.logs: List[AuditLog] = []
-        logger.info("Audit logger initialized")
+        # Epoch-microsecond timestamps parallel to self.logs, so get_logs never
+        # touches pydantic attributes on non-matching entries. Both are kept
+        # sorted by timestamp so time ranges are bisectable.
+        self._timestamps: List[int] = []
+        # The same pair of sorted lists per repository, so a repository filter
+        # only walks that repository's entries
+        self._repo_timestamps: Dict[str, List[int]] = defaultdict(list)
+        self._repo_logs: Dict[str, List[AuditLog]] = defaultdict(list)
+        # Materialized per-day aggregates, updated on ingest
+        self.daily_stats: Dict[Tuple[str, date, str], Dict[str, int]] = {}
+        self.store = None
+        # Optional append-only JSONL file backing the in-memory storage
+        self.log_file: Optional[Path] = None
+        # Pending writes, drained by a background task started on first use
+        self._queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        if settings.AUDIT_DATABASE_URL:
+            if SQLAuditStore is None:
+                logger.error("AUDIT_DATABASE_URL is set but SQLAlchemy is not installed; "
+                             "falling back to in-memory audit storage")
+            else:
+                self.store = SQLAuditStore(settings.AUDIT_DATABASE_URL)
+        
+        if not self.store and settings.AUDIT_LOG_FILE:
+            self.log_file = Path(settings.AUDIT_LOG_FILE)
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._load_logs()
+        
+        logger.info(f"Audit logger initialized ({'sql' if self.store else 'in-memory'} storage)")
+    
+    def _load_logs(self):
+        """Load persisted audit logs, one JSON object per line"""
+        if not self.log_file.exists():
+            return
+        
+        with open(self.log_file, 'r') as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    self._index_log(self._construct_log(json.loads(line)))
+                except Exception as e:
+                    logger.warning(f"Skipping malformed audit log line {line_num}: {e}")
+        
+        logger.info(f"Loaded {len(self.logs)} audit logs from {self.log_file}")
+    
+    @staticmethod
+    def _construct_log(log_data: Dict[str, Any]) -> AuditLog:
+        """Rebuild an entry we serialized ourselves, skipping pydantic validation"""
+        log_data["timestamp"] = datetime.fromisoformat(log_data["timestamp"])
+        log_data["enforcement_action"] = EnforcementMode(log_data["enforcement_action"])
+        # Repository, action and detail keys repeat across every entry; share one
+        # string object each instead of keeping a fresh copy per parsed line
+        log_data["repository"] = sys.intern(log_data["repository"])
+        log_data["action"] = sys.intern(log_data["action"])
+        log_data["details"] = {sys.intern(key): value for key, value in log_data["details"].items()}
+        return AuditLog.model_construct(**log_data)
+    
+    def _index_log(self, log_entry: AuditLog):
+        """Add an entry to in-memory storage and its daily rollup"""
+        timestamp = _epoch_us(log_entry.timestamp)
+        _insert_sorted(self._timestamps, self.logs, timestamp, log_entry)
+        _insert_sorted(
+            self._repo_timestamps[log_entry.repository],
+            self._repo_logs[log_entry.repository],
+            timestamp,
+            log_entry
+        )
+        
+        key = (log_entry.repository, log_entry.timestamp.date(), log_entry.enforcement_action.value)
+        row = self.daily_stats.get(key)
+        if row is None:
+            row = self.daily_stats[key] = dict.fromkeys(DAILY_STAT_FIELDS, 0)
+        accumulate_daily_stats(row, log_entry)
+    
+    async def _append_logs(self, log_entries: List[AuditLog]):
+        """Append entries in a single write; bytes written are O(batch) per flush"""
+        async with aiofiles.open(self.log_file, 'a') as f:
+            await f.write("".join(entry.model_dump_json() + "\n" for entry in log_entries))
+    
+    async def _enqueue(self, log_entry: AuditLog):
+        """Queue an entry for the background flusher, waiting if the queue is full"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_MAXSIZE)
+        if self._flush_task is None or self._flush_task.done():
+            # A stopped flusher restarts on the same queue, so entries it left behind are still written
+            self._flush_task = asyncio.create_task(self._flush_worker())
+        await self._queue.put(log_entry)
+    
+    async def _flush_worker(self):
+        """Drain the queue in batches until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + FLUSH_LINGER_SECONDS
+            while len(batch) < FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} audit logs: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _write_batch(self, batch: List[AuditLog]):
+        if self.store:
+            await self.store.add_many(batch)
+            # Rows are only visible to readers once committed
+            for repository in {entry.repository for entry in batch}:
+                dashboard_cache.invalidate(repository)
+        elif self.log_file:
+            await self._append_logs(batch)
+        logger.debug(f"Flushed {len(batch)} audit logs")
+    
+    async def flush(self):
+        """Wait until all queued entries have been written"""
+        if self._flush_task and not self._flush_task.done():
+            await self._queue.join()
+    
+    async def close(self):
+        """Flush pending writes and release storage resources"""
+        await self.flush()
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self.store:
+            await self.store.close()
     
     async def log_scan(self, result: ScanResult, request: ScanRequest):
         """Log a scan event"""
         try:
             log_entry = AuditLog(
-                log_id=str(uuid.uuid4()),
+                log_id=str(uuid7()),
                 timestamp=datetime.utcnow(),
-                repository=result.repository,
+                repository=normalize_repository(result.repository),
                 action="scan",
                 user=None,  # Would be populated from GitHub context
                 details={
@@ -45,9 +242,15 @@ class AuditLogger:
                 resolved=False
             )
             
-            self.logs.append(log_entry)
+            if self.store:
+                await self._enqueue(log_entry)
+            else:
+                self._index_log(log_entry)
+                if self.log_file:
+                    await self._enqueue(log_entry)
+                # New data makes cached dashboard responses for this repository stale
+                dashboard_cache.invalidate(log_entry.repository)
             
-            # In production, persist to database
             logger.info(f"Audit log created: {log_entry.log_id}")
         except Exception as e:
             logger.error(f"Failed to create audit log: {e}")
@@ -60,21 +263,90 @@ class AuditLogger:
         limit: int = 100
     ) -> List[AuditLog]:
         """Retrieve audit logs with filtering"""
-        filtered_logs = self.logs
+        if self.store:
+            return await self.store.query(repository, start_date, end_date, limit)
         
+        logs, lo, hi = self._time_range(repository, start_date, end_date)
+        
+        # Lists are sorted ascending, so newest-first is the reversed tail of the range
+        return logs[max(lo, hi - limit):hi][::-1]
+    
+    def _time_range(
+        self,
+        repository: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Tuple[List[AuditLog], int, int]:
+        """Sorted in-memory logs for the repository plus the [lo, hi) slice bounds"""
         if repository:
-            filtered_logs = [log for log in filtered_logs if log.repository == repository]
+            if repository not in self._repo_logs:
+                return [], 0, 0
+            timestamps = self._repo_timestamps[repository]
+            logs = self._repo_logs[repository]
+        else:
+            timestamps = self._timestamps
+            logs = self.logs
+        
+        lo = bisect.bisect_left(timestamps, _epoch_us(start_date)) if start_date else 0
+        hi = bisect.bisect_right(timestamps, _epoch_us(end_date)) if end_date else len(timestamps)
+        return logs, lo, hi
+    
+    async def aggregate_stats(
+        self,
+        repository: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate logs in a time range, one row per enforcement action
+        
+        Rows carry the same counters as get_daily_stats, without a day.
+        """
+        if self.store:
+            return await self.store.aggregate(repository, start_date, end_date)
         
-        if start_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= start_date]
+        logs, lo, hi = self._time_range(repository, start_date, end_date)
+        totals: Dict[str, Dict[str, int]] = {}
+        for i in range(lo, hi):
+            log = logs[i]
+            row = totals.get(log.enforcement_action.value)
+            if row is None:
+                row = totals[log.enforcement_action.value] = dict.fromkeys(DAILY_STAT_FIELDS, 0)
+            accumulate_daily_stats(row, log)
         
-        if end_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp <= end_date]
+        return [
+            {"enforcement_action": enforcement_action, **counters}
+            for enforcement_action, counters in totals.items()
+        ]
+    
+    async def get_daily_stats(
+        self,
+        repository: Optional[str] = None,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve materialized per-day aggregates
         
-        # Sort by timestamp descending
-        filtered_logs.sort(key=lambda x: x.timestamp, reverse=True)
+        Returns one row per (repository, day, enforcement_action) with the
+        counters in DAILY_STAT_FIELDS.
+        """
+        if self.store:
+            return await self.store.query_daily_stats(repository, start_day, end_day)
         
-        return filtered_logs[:limit]
+        rows = []
+        for (repo, day, enforcement_action), counters in self.daily_stats.items():
+            if repository and repo != repository:
+                continue
+            if start_day and day < start_day:
+                continue
+            if end_day and day > end_day:
+                continue
+            rows.append({
+                "repository": repo,
+                "day": day,
+                "enforcement_action": enforcement_action,
+                **counters
+            })
+        return rows
     
     async def export_logs(
         self,
@@ -82,28 +354,57 @@ class AuditLogger:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         format: str = "json"
-    ) -> Dict[str, Any]:
+    ) -> Union[AuditLogExport, Dict[str, Any]]:
         """Export audit logs in specified format"""
         logs = await self.get_logs(repository, start_date, end_date, limit=10000)
         
         if format == "json":
-            return {
-                "format": "json",
-                "count": len(logs),
-                "logs": [log.dict() for log in logs]
-            }
+            # Serialized by pydantic-core in one pass, no per-log dict() round trip
+            return AuditLogExport(count=len(logs), logs=logs)
         elif format == "csv":
-            # Generate CSV
-            csv_lines = ["log_id,timestamp,repository,action,violations_count,enforcement_action,resolved"]
-            for log in logs:
-                csv_lines.append(
-                    f"{log.log_id},{log.timestamp.isoformat()},{log.repository},"
-                    f"{log.action},{log.violations_count},{log.enforcement_action.value},{log.resolved}"
-                )
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(CSV_HEADER)
+            writer.writerows(_csv_row(log) for log in logs)
             return {
                 "format": "csv",
                 "count": len(logs),
-                "content": "\n".join(csv_lines)
+                "content": buffer.getvalue().rstrip("\n")
             }
         
         raise ValueError(f"Unsupported format: {format}")
+    
+    async def iter_csv(
+        self,
+        repository: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 10000
+    ) -> AsyncIterator[str]:
+        """Yield audit logs as CSV, one line at a time"""
+        if self.store:
+            logs = self.store.stream(repository, start_date, end_date, limit)
+        else:
+            logs = self._iter_memory_logs(repository, start_date, end_date, limit)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        
+        writer.writerow(CSV_HEADER)
+        yield buffer.getvalue()
+        
+        async for log in logs:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(_csv_row(log))
+            yield buffer.getvalue()
+    
+    async def _iter_memory_logs(
+        self,
+        repository: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        limit: int
+    ) -> AsyncIterator[AuditLog]:
+        for log in await self.get_logs(repository, start_date, end_date, limit):
+            yield log
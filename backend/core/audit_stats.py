@@ -0,0 +1,22 @@
+"""
+Materialized audit aggregates shared by the in-memory and SQL audit stores
+"""
+from typing import Dict
+try:
+    from models.schemas import AuditLog
+except ImportError:
+    from ..models.schemas import AuditLog
+
+# Counters kept per (repository, day, enforcement_action) rollup row
+DAILY_STAT_FIELDS = ("scans", "violations", "copilot_scans", "copilot_violations", "resolved")
+
+
+def accumulate_daily_stats(row: Dict[str, int], log: AuditLog):
+    """Add a single log entry's contribution to a rollup row, in place"""
+    row["scans"] += 1
+    row["violations"] += log.violations_count
+    if log.details.get("copilot_detected", False):
+        row["copilot_scans"] += 1
+        row["copilot_violations"] += log.violations_count
+    if log.resolved:
+        row["resolved"] += 1
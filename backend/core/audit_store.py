@@ -0,0 +1,287 @@
+"""
+SQL-backed audit log storage (SQLAlchemy async)
+"""
+import asyncio
+import logging
+from datetime import datetime, date
+from typing import AsyncIterator, List, Optional, Dict, Any
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Index, Integer, String, case, func, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+try:
+    from models.schemas import AuditLog, EnforcementMode
+    from core.audit_stats import DAILY_STAT_FIELDS, accumulate_daily_stats
+except ImportError:
+    from ..models.schemas import AuditLog, EnforcementMode
+    from ..core.audit_stats import DAILY_STAT_FIELDS, accumulate_daily_stats
+
+logger = logging.getLogger(__name__)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class AuditLogRecord(Base):
+    """ORM row for a single audit log entry"""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Serves the "recent logs for repo X" path as an index range scan
+        Index("ix_audit_logs_repository_timestamp", "repository", "timestamp"),
+    )
+
+    log_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, index=True)
+    repository: Mapped[str] = mapped_column(String(255), index=True)
+    action: Mapped[str] = mapped_column(String(32))
+    user: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    details: Mapped[dict] = mapped_column(JSON, default=dict)
+    violations_count: Mapped[int] = mapped_column(Integer, default=0)
+    enforcement_action: Mapped[str] = mapped_column(String(16))
+    resolved: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Copied out of details so aggregates never have to parse the JSON column
+    copilot_detected: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    @classmethod
+    def from_audit_log(cls, log: AuditLog) -> "AuditLogRecord":
+        return cls(
+            log_id=log.log_id,
+            timestamp=log.timestamp,
+            repository=log.repository,
+            action=log.action,
+            user=log.user,
+            details=log.details,
+            violations_count=log.violations_count,
+            enforcement_action=log.enforcement_action.value,
+            resolved=log.resolved,
+            copilot_detected=bool(log.details.get("copilot_detected", False))
+        )
+
+    def to_audit_log(self) -> AuditLog:
+        return AuditLog(
+            log_id=self.log_id,
+            timestamp=self.timestamp,
+            repository=self.repository,
+            action=self.action,
+            user=self.user,
+            details=self.details or {},
+            violations_count=self.violations_count,
+            enforcement_action=EnforcementMode(self.enforcement_action),
+            resolved=self.resolved
+        )
+
+
+class AuditDailyStatRecord(Base):
+    """Materialized per-day aggregate, incrementally maintained on insert"""
+    __tablename__ = "audit_daily_stats"
+
+    repository: Mapped[str] = mapped_column(String(255), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    enforcement_action: Mapped[str] = mapped_column(String(16), primary_key=True)
+    scans: Mapped[int] = mapped_column(Integer, default=0)
+    violations: Mapped[int] = mapped_column(Integer, default=0)
+    copilot_scans: Mapped[int] = mapped_column(Integer, default=0)
+    copilot_violations: Mapped[int] = mapped_column(Integer, default=0)
+    resolved: Mapped[int] = mapped_column(Integer, default=0)
+
+
+# Columns added to audit_logs after its first release: name -> (DDL, backfill per dialect).
+# create_all never alters an existing table, so _ensure_schema adds them itself
+_ADDED_AUDIT_LOG_COLUMNS = {
+    "copilot_detected": (
+        "ALTER TABLE audit_logs ADD COLUMN copilot_detected BOOLEAN NOT NULL DEFAULT FALSE",
+        {
+            "sqlite": "UPDATE audit_logs SET copilot_detected = "
+                      "COALESCE(json_extract(details, '$.copilot_detected'), 0) != 0",
+            "postgresql": "UPDATE audit_logs SET copilot_detected = "
+                          "COALESCE((details->>'copilot_detected')::boolean, FALSE)",
+        },
+    ),
+}
+
+
+def _add_missing_columns(sync_conn):
+    """Add and backfill audit_logs columns that an older table lacks"""
+    existing = {column["name"] for column in inspect(sync_conn).get_columns("audit_logs")}
+    dialect = sync_conn.dialect.name
+    for name, (ddl, backfills) in _ADDED_AUDIT_LOG_COLUMNS.items():
+        if name in existing:
+            continue
+        logger.info(f"Adding column audit_logs.{name}")
+        sync_conn.execute(text(ddl))
+        if dialect in backfills:
+            sync_conn.execute(text(backfills[dialect]))
+        else:
+            logger.warning(f"No backfill for audit_logs.{name} on {dialect}; older rows read as the default")
+
+
+class SQLAuditStore:
+    """Audit log persistence backed by any SQLAlchemy async database URL"""
+
+    def __init__(self, database_url: str):
+        self.engine = create_async_engine(database_url)
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+        logger.info(f"SQL audit store configured ({self.engine.dialect.name})")
+
+    async def _ensure_schema(self):
+        """Create tables and indexes on first use, and add columns older tables lack"""
+        if self._schema_ready:
+            return
+        async with self._schema_lock:
+            if not self._schema_ready:
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                    await conn.run_sync(_add_missing_columns)
+                self._schema_ready = True
+
+    async def add(self, log: AuditLog):
+        """Insert a single audit log entry"""
+        await self.add_many([log])
+
+    async def add_many(self, logs: List[AuditLog]):
+        """Insert a batch of audit log entries in one transaction"""
+        await self._ensure_schema()
+        # Fold the batch into one rollup increment per (repository, day, action)
+        increments: Dict[tuple, Dict[str, int]] = {}
+        for log in logs:
+            key = (log.repository, log.timestamp.date(), log.enforcement_action.value)
+            row = increments.setdefault(key, dict.fromkeys(DAILY_STAT_FIELDS, 0))
+            accumulate_daily_stats(row, log)
+
+        async with self.session_factory() as session:
+            session.add_all([AuditLogRecord.from_audit_log(log) for log in logs])
+            for key, row in increments.items():
+                await session.execute(self._daily_stats_upsert(*key, row))
+            await session.commit()
+
+    def _daily_stats_upsert(self, repository: str, day: date, enforcement_action: str, increments: Dict[str, int]):
+        """INSERT ... ON CONFLICT DO UPDATE incrementing the day's rollup row"""
+        dialect = postgresql if self.engine.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(AuditDailyStatRecord).values(
+            repository=repository,
+            day=day,
+            enforcement_action=enforcement_action,
+            **increments
+        )
+        table = AuditDailyStatRecord.__table__
+        return stmt.on_conflict_do_update(
+            index_elements=["repository", "day", "enforcement_action"],
+            set_={field: table.c[field] + stmt.excluded[field] for field in DAILY_STAT_FIELDS}
+        )
+
+    async def query(
+        self,
+        repository: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[AuditLog]:
+        """Filter, order and limit inside the database"""
+        await self._ensure_schema()
+        stmt = self._logs_query(repository, start_date, end_date, limit)
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return [record.to_audit_log() for record in result.scalars()]
+
+    async def stream(
+        self,
+        repository: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 10000,
+        batch_size: int = 500
+    ) -> AsyncIterator[AuditLog]:
+        """Yield matching logs from a server-side cursor, batch_size rows at a time"""
+        await self._ensure_schema()
+        stmt = self._logs_query(repository, start_date, end_date, limit)
+        stmt = stmt.execution_options(yield_per=batch_size)
+
+        async with self.session_factory() as session:
+            result = await session.stream_scalars(stmt)
+            async for record in result:
+                yield record.to_audit_log()
+
+    async def aggregate(
+        self,
+        repository: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """GROUP BY enforcement_action over a time range, computed in the database"""
+        await self._ensure_schema()
+        copilot = AuditLogRecord.copilot_detected
+        violations = func.coalesce(func.sum(AuditLogRecord.violations_count), 0)
+        stmt = select(
+            AuditLogRecord.enforcement_action,
+            func.count().label("scans"),
+            violations.label("violations"),
+            func.coalesce(func.sum(case((copilot, 1), else_=0)), 0).label("copilot_scans"),
+            func.coalesce(func.sum(case((copilot, AuditLogRecord.violations_count), else_=0)), 0)
+            .label("copilot_violations"),
+            func.coalesce(func.sum(case((AuditLogRecord.resolved, 1), else_=0)), 0).label("resolved")
+        )
+        if repository:
+            stmt = stmt.where(AuditLogRecord.repository == repository)
+        if start_date:
+            stmt = stmt.where(AuditLogRecord.timestamp >= start_date)
+        if end_date:
+            stmt = stmt.where(AuditLogRecord.timestamp <= end_date)
+        stmt = stmt.group_by(AuditLogRecord.enforcement_action)
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return [dict(row._mapping) for row in result]
+
+    def _logs_query(
+        self,
+        repository: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        limit: int
+    ):
+        stmt = select(AuditLogRecord)
+        if repository:
+            stmt = stmt.where(AuditLogRecord.repository == repository)
+        if start_date:
+            stmt = stmt.where(AuditLogRecord.timestamp >= start_date)
+        if end_date:
+            stmt = stmt.where(AuditLogRecord.timestamp <= end_date)
+        return stmt.order_by(AuditLogRecord.timestamp.desc()).limit(limit)
+
+    async def query_daily_stats(
+        self,
+        repository: Optional[str] = None,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Read rollup rows; a small indexed lookup instead of a log scan"""
+        await self._ensure_schema()
+        stmt = select(AuditDailyStatRecord)
+        if repository:
+            stmt = stmt.where(AuditDailyStatRecord.repository == repository)
+        if start_day:
+            stmt = stmt.where(AuditDailyStatRecord.day >= start_day)
+        if end_day:
+            stmt = stmt.where(AuditDailyStatRecord.day <= end_day)
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return [
+                {
+                    "repository": row.repository,
+                    "day": row.day,
+                    "enforcement_action": row.enforcement_action,
+                    **{field: getattr(row, field) for field in DAILY_STAT_FIELDS}
+                }
+                for row in result.scalars()
+            ]
+
+    async def close(self):
+        """Dispose of the connection pool"""
+        await self.engine.dispose()
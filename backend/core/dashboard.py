@@ -2,8 +2,8 @@
 Dashboard and reporting service
 """
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 try:
     from core.audit import AuditLogger
 except ImportError:
@@ -15,8 +15,8 @@ logger = logging.getLogger(__name__)
 class DashboardService:
     """Dashboard statistics and reporting service"""
     
-    def __init__(self):
-        self.audit_logger = AuditLogger()
+    def __init__(self, audit_logger: Optional[AuditLogger] = None):
+        self.audit_logger = audit_logger or AuditLogger()
     
     async def get_stats(
         self,
@@ -25,29 +25,17 @@ class DashboardService:
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get dashboard statistics"""
-        logs = await self.audit_logger.get_logs(
-            repository=repository,
-            start_date=start_date,
-            end_date=end_date,
-            limit=10000
-        )
-        
-        total_scans = len(logs)
-        total_violations = sum(log.violations_count for log in logs)
-        
-        enforcement_counts = {}
-        for log in logs:
-            mode = log.enforcement_action.value
-            enforcement_counts[mode] = enforcement_counts.get(mode, 0) + 1
+        if start_date or end_date:
+            # Arbitrary time bounds need log-level precision; aggregate in the store
+            rows = await self.audit_logger.aggregate_stats(
+                repository=repository,
+                start_date=start_date,
+                end_date=end_date
+            )
+        else:
+            rows = await self.audit_logger.get_daily_stats(repository=repository)
         
-        return {
-            "total_scans": total_scans,
-            "total_violations": total_violations,
-            "average_violations_per_scan": total_violations / total_scans if total_scans > 0 else 0,
-            "enforcement_distribution": enforcement_counts,
-            "resolved_count": len([log for log in logs if log.resolved]),
-            "unresolved_count": len([log for log in logs if not log.resolved])
-        }
+        return self._stats_from_rows(rows)
     
     async def get_violation_trends(
         self,
@@ -55,58 +43,125 @@ class DashboardService:
         days: int = 30
     ) -> Dict[str, Any]:
         """Get violation trends over time"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        logs = await self.audit_logger.get_logs(
+        start_date, end_date = self._trend_window(days)
+        rows = await self.audit_logger.get_daily_stats(
             repository=repository,
-            start_date=start_date,
-            end_date=end_date,
-            limit=10000
+            start_day=start_date.date(),
+            end_day=end_date.date()
         )
-        
-        # Group by date
-        daily_stats = {}
-        for log in logs:
-            date_key = log.timestamp.date().isoformat()
-            if date_key not in daily_stats:
-                daily_stats[date_key] = {
-                    "date": date_key,
-                    "scans": 0,
-                    "violations": 0
-                }
-            daily_stats[date_key]["scans"] += 1
-            daily_stats[date_key]["violations"] += log.violations_count
-        
-        return {
-            "period_days": days,
-            "daily_trends": list(daily_stats.values())
-        }
+        return await self._trends(rows, repository, days, start_date)
     
     async def get_copilot_insights(
         self,
         repository: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get Copilot-related insights"""
-        logs = await self.audit_logger.get_logs(
+        rows = await self.audit_logger.get_daily_stats(repository=repository)
+        return self._copilot_from_rows(rows)
+    
+    async def get_dashboard_bundle(
+        self,
+        repository: Optional[str] = None,
+        days: int = 30
+    ) -> Dict[str, Any]:
+        """Stats, trends and Copilot insights from a single rollup fetch"""
+        rows = await self.audit_logger.get_daily_stats(repository=repository)
+        start_date, _ = self._trend_window(days)
+        return {
+            "stats": self._stats_from_rows(rows),
+            "trends": await self._trends(rows, repository, days, start_date),
+            "copilot": self._copilot_from_rows(rows)
+        }
+    
+    @staticmethod
+    def _trend_window(days: int) -> Tuple[datetime, datetime]:
+        end_date = datetime.utcnow()
+        return end_date - timedelta(days=days), end_date
+    
+    async def _trends(
+        self,
+        rows: List[Dict[str, Any]],
+        repository: Optional[str],
+        days: int,
+        start_date: datetime
+    ) -> Dict[str, Any]:
+        """Trends since `start_date` from daily rollups
+        
+        The window starts mid-day, so its first day is recounted from the logs
+        at or after `start_date` rather than taken whole from the rollup.
+        """
+        first_day = start_date.date()
+        first_day_end = datetime.combine(first_day + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
+        partial = await self.audit_logger.aggregate_stats(
             repository=repository,
-            limit=10000
+            start_date=start_date,
+            end_date=first_day_end
         )
+        rows = [row for row in rows if row["day"] > first_day]
+        rows.extend(dict(row, day=first_day) for row in partial)
+        return self._trends_from_rows(rows, days, first_day)
+    
+    @staticmethod
+    def _stats_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total_scans = 0
+        total_violations = 0
+        resolved_count = 0
+        enforcement_counts = {}
+        for row in rows:
+            total_scans += row["scans"]
+            total_violations += row["violations"]
+            resolved_count += row["resolved"]
+            mode = row["enforcement_action"]
+            enforcement_counts[mode] = enforcement_counts.get(mode, 0) + row["scans"]
         
-        copilot_scans = [
-            log for log in logs
-            if log.details.get("copilot_detected", False)
-        ]
+        return {
+            "total_scans": total_scans,
+            "total_violations": total_violations,
+            "average_violations_per_scan": total_violations / total_scans if total_scans > 0 else 0,
+            "enforcement_distribution": enforcement_counts,
+            "resolved_count": resolved_count,
+            "unresolved_count": total_scans - resolved_count
+        }
+    
+    @staticmethod
+    def _trends_from_rows(rows: List[Dict[str, Any]], days: int, start_day: date) -> Dict[str, Any]:
+        # Group by integer day ordinal; dates are only rendered once per day
+        start_ordinal = start_day.toordinal()
+        daily_stats: Dict[int, List[int]] = {}
+        for row in rows:
+            day = row["day"].toordinal()
+            if day < start_ordinal:
+                continue
+            counters = daily_stats.get(day)
+            if counters is None:
+                counters = daily_stats[day] = [0, 0]
+            counters[0] += row["scans"]
+            counters[1] += row["violations"]
         
-        copilot_violations = sum(log.violations_count for log in copilot_scans)
-        total_violations = sum(log.violations_count for log in logs)
+        # Most recent first
+        return {
+            "period_days": days,
+            "daily_trends": [
+                {"date": date.fromordinal(day).isoformat(), "scans": scans, "violations": violations}
+                for day, (scans, violations) in sorted(daily_stats.items(), reverse=True)
+            ]
+        }
+    
+    @staticmethod
+    def _copilot_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total_scans = total_violations = copilot_scans = copilot_violations = 0
+        for row in rows:
+            total_scans += row["scans"]
+            total_violations += row["violations"]
+            copilot_scans += row["copilot_scans"]
+            copilot_violations += row["copilot_violations"]
         
         return {
-            "copilot_scans_count": len(copilot_scans),
-            "total_scans_count": len(logs),
-            "copilot_scan_percentage": (len(copilot_scans) / len(logs) * 100) if logs else 0,
+            "copilot_scans_count": copilot_scans,
+            "total_scans_count": total_scans,
+            "copilot_scan_percentage": (copilot_scans / total_scans * 100) if total_scans else 0,
             "copilot_violations": copilot_violations,
             "total_violations": total_violations,
-            "copilot_violation_rate": (copilot_violations / len(copilot_scans)) if copilot_scans else 0,
-            "average_violation_rate": (total_violations / len(logs)) if logs else 0
+            "copilot_violation_rate": (copilot_violations / copilot_scans) if copilot_scans else 0,
+            "average_violation_rate": (total_violations / total_scans) if total_scans else 0
         }
@@ -0,0 +1,72 @@
+"""
+Time-windowed LRU cache for dashboard responses
+"""
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+try:
+    from core.config import settings
+except ImportError:
+    from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL
+
+    Keys are tuples of the form (endpoint, repository, ...) so that entries
+    can be invalidated per repository when new audit data arrives.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        if not self.enabled:
+            return None
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple[Hashable, ...], value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, repository: Optional[str] = None):
+        """Drop entries for a repository (plus cross-repository entries), or everything"""
+        if repository is None:
+            self._entries.clear()
+            return
+
+        stale = [key for key in self._entries if key[1] in (repository, None)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} dashboard cache entries for {repository}")
+
+
+dashboard_cache = TTLCache(
+    maxsize=1024,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    enabled=settings.DASHBOARD_CACHE_ENABLED
+)
@@ -0,0 +1,37 @@
+"""
+Shared service instances for API routes
+
+Each getter builds its service once per process; routes receive them via
+FastAPI ``Depends`` so tests can swap them with ``app.dependency_overrides``.
+"""
+from functools import lru_cache
+try:
+    from core.audit import AuditLogger
+    from core.dashboard import DashboardService
+    from core.scanner import CodeScanner
+    from engines.policy_engine import PolicyEngine
+except ImportError:
+    from ..core.audit import AuditLogger
+    from ..core.dashboard import DashboardService
+    from ..core.scanner import CodeScanner
+    from ..engines.policy_engine import PolicyEngine
+
+
+@lru_cache
+def get_audit_logger() -> AuditLogger:
+    return AuditLogger()
+
+
+@lru_cache
+def get_policy_engine() -> PolicyEngine:
+    return PolicyEngine()
+
+
+@lru_cache
+def get_dashboard_service() -> DashboardService:
+    return DashboardService(audit_logger=get_audit_logger())
+
+
+@lru_cache
+def get_code_scanner() -> CodeScanner:
+    return CodeScanner(policy_engine=get_policy_engine())
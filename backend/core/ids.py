@@ -0,0 +1,21 @@
+"""
+Identifier helpers
+"""
+import os
+import time
+import uuid
+
+_UNIX_MS_MASK = (1 << 48) - 1
+
+
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7)
+
+    The leading 48 bits are the Unix time in milliseconds, so ids sort by
+    creation time and database primary-key inserts land at the end of the index.
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    value = (unix_ms & _UNIX_MS_MASK) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # variant
+    return uuid.UUID(int=value)
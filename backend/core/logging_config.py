@@ -2,10 +2,16 @@
 Logging configuration
 """
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from typing import Optional
 from core.config import settings
 
+# Background thread that owns the file/console handlers
+_listener: Optional[logging.handlers.QueueListener] = None
+
 
 def setup_logging():
     """Setup application logging"""
@@ -19,17 +25,49 @@ def setup_logging():
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
     
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.FileHandler(log_file_path),
-            logging.StreamHandler(sys.stdout)
-        ]
+    formatter = logging.Formatter(log_format, datefmt=date_format)
+    file_handler = logging.FileHandler(log_file_path)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    
+    # Request handling only enqueues records; a listener thread does the I/O
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+    
+    # Configure root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def shutdown_logging():
+    """Flush queued log records and stop the listener thread
+    
+    The listener's handlers are attached to the root logger directly, so
+    anything logged afterwards is still written.
+    """
+    global _listener
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        root_logger.addHandler(handler)
+    _listener = None
@@ -0,0 +1,29 @@
+"""
+Repository name helpers
+"""
+import re
+from functools import lru_cache
+
+_REPO_URL_PREFIX = re.compile(r'^(?:https?://)?(?:www\.)?github\.com/|^https?://')
+_TRAILING_SLASHES = re.compile(r'/+$')
+
+
+@lru_cache(maxsize=4096)
+def normalize_repository(repository: str) -> str:
+    """Normalize a repository reference to ``owner/repo``
+
+    Accepts plain ``owner/repo`` names as well as GitHub URLs such as
+    ``https://github.com/owner/repo.git``. Memoized because dashboards send
+    the same handful of repositories on every poll.
+    """
+    repository = repository.strip()
+    # Fast path: already an owner/repo name
+    if (repository.count('/') == 1 and '://' not in repository
+            and not repository.endswith(('/', '.git'))
+            and not repository.startswith(('github.com', 'www.github.com'))):
+        return repository
+
+    normalized = _TRAILING_SLASHES.sub('', _REPO_URL_PREFIX.sub('', repository))
+    if normalized.endswith('.git'):
+        normalized = normalized[:-4]
+    return '/'.join(normalized.rsplit('/', 2)[-2:])
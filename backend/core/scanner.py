@@ -1,51 +1,168 @@
 """
 Main scanning orchestrator combining all analysis engines
 """
+import asyncio
+import hashlib
+import re
 import time
 import logging
 import uuid
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import attrgetter, itemgetter
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Set, Tuple
 try:
     from models.schemas import (
-        ScanRequest, ScanResult, Violation, EnforcementMode, PolicyConfig
+        ScanRequest, ScanResult, Violation, EnforcementMode, PolicyConfig, Severity
     )
     from engines.static_analyzer import StaticAnalyzer
     from engines.ai_analyzer import AIAnalyzer
     from engines.copilot_detector import CopilotDetector
     from engines.license_checker import LicenseChecker
     from engines.policy_engine import PolicyEngine
+    from core.config import settings
 except ImportError:
     from ..models.schemas import (
-        ScanRequest, ScanResult, Violation, EnforcementMode, PolicyConfig
+        ScanRequest, ScanResult, Violation, EnforcementMode, PolicyConfig, Severity
     )
     from ..engines.static_analyzer import StaticAnalyzer
     from ..engines.ai_analyzer import AIAnalyzer
     from ..engines.copilot_detector import CopilotDetector
     from ..engines.license_checker import LicenseChecker
     from ..engines.policy_engine import PolicyEngine
+    from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Static-analysis fix suggestions that are boilerplate and worth asking the AI to make specific
+GENERIC_FIX_PHRASES = (
+    "use environment variables",
+    "use safer alternatives",
+    "implement strict input validation",
+    "use parameterized queries",
+)
+_GENERIC_FIX_RE = re.compile("|".join(re.escape(phrase) for phrase in GENERIC_FIX_PHRASES), re.IGNORECASE)
+_severity_value = attrgetter("severity.value")
+_category_value = attrgetter("category.value")
+_is_copilot_generated = attrgetter("is_copilot_generated")
+_file_path = attrgetter("file_path")
+
+# Violations per batched fix-suggestion request, and lines of code around each one
+FIX_BATCH_SIZE = 10
+FIX_CONTEXT_LINES = 3
+
+# Files up to BATCH_FILE_MAX_CHARS with no fixes to request are analyzed several
+# to a request: up to BATCH_MAX_CHARS (~30k tokens) of code, gathered for at
+# most BATCH_WINDOW_SECONDS
+BATCH_FILE_MAX_CHARS = 4000
+BATCH_MAX_CHARS = 120_000
+BATCH_WINDOW_SECONDS = 0.05
+
+# With SCAN_PROCESS_WORKERS set, files at least this large get static analysis and
+# license checking in worker processes; below it, pickling costs more than the pass itself
+PROCESS_MIN_CHARS = 20_000
+
+_worker_static_analyzer: Optional[StaticAnalyzer] = None
+_worker_license_checker: Optional[LicenseChecker] = None
+
+
+def _static_analysis_worker(
+    file_path: str, content: str, is_copilot: bool, severity_threshold: Severity
+) -> List[Violation]:
+    """StaticAnalyzer.analyze_file in a worker process, with one analyzer per process"""
+    global _worker_static_analyzer
+    if _worker_static_analyzer is None:
+        _worker_static_analyzer = StaticAnalyzer()
+    return _worker_static_analyzer.analyze_file(file_path, content, is_copilot, severity_threshold)
+
+
+def _license_check_worker(file_path: str, content: str) -> List[Violation]:
+    """LicenseChecker.check_file in a worker process, with one checker per process"""
+    global _worker_license_checker
+    if _worker_license_checker is None:
+        _worker_license_checker = LicenseChecker()
+    return _worker_license_checker.check_file(file_path, content)
+
+
+def _apply_fixes(violations: List[Violation], fixes: List[Optional[str]]):
+    """Overwrite fix suggestions with the AI fixes that came back"""
+    for violation, fix in zip(violations, fixes):
+        if fix:
+            violation.fix_suggestion = fix
+
+
+class _AnalysisBatcher:
+    """Coalesces one scan's small-file AI analyses into multi-file requests"""
+    
+    def __init__(self, submit: Callable[[List[Tuple[str, str, Dict[str, Any], bool]]], Awaitable[List[List[Violation]]]]):
+        self._submit = submit
+        self._pending: List[Tuple[Tuple[str, str, Dict[str, Any], bool], asyncio.Future]] = []
+        self._pending_chars = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to running batches; the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def analyze(
+        self, file_path: str, content: str, metadata: Dict[str, Any], is_copilot: bool
+    ) -> Tuple[List[Violation], List[Optional[str]]]:
+        """Queue one file; returns its AI violations (and no fixes) once its batch is answered"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((file_path, content, metadata, is_copilot), future))
+        self._pending_chars += len(content)
+        if self._pending_chars >= BATCH_MAX_CHARS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(BATCH_WINDOW_SECONDS, self._flush)
+        return await future, []
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_chars = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[Tuple[str, str, Dict[str, Any], bool], asyncio.Future]]):
+        try:
+            results = await self._submit([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), violations in zip(batch, results):
+            if not future.done():
+                future.set_result(violations)
+
 
 class CodeScanner:
     """Main code scanning orchestrator"""
     
-    def __init__(self):
+    def __init__(self, policy_engine: Optional[PolicyEngine] = None):
         self.static_analyzer = StaticAnalyzer()
         self.ai_analyzer = AIAnalyzer()
         self.copilot_detector = CopilotDetector()
         self.license_checker = LicenseChecker()
-        self.policy_engine = PolicyEngine()
+        self.policy_engine = policy_engine or PolicyEngine()
+        # Caps in-flight AI requests across all files being scanned
+        self._ai_semaphore = asyncio.Semaphore(settings.SCAN_MAX_CONCURRENCY)
+        # Regex scanning holds the GIL, so threads only keep it off the event loop;
+        # worker processes let large files be analyzed on several cores
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        if settings.SCAN_PROCESS_WORKERS > 0:
+            self._process_pool = ProcessPoolExecutor(settings.SCAN_PROCESS_WORKERS)
     
     async def scan(self, request: ScanRequest) -> ScanResult:
         """Perform comprehensive code scan"""
         start_time = time.time()
         scan_id = str(uuid.uuid4())
         
-        logger.info(f"Starting scan {scan_id} for {request.repository}")
-        
-        all_violations: List[Violation] = []
-        copilot_detected = False
+        logger.debug(f"Starting scan {scan_id} for {request.repository}")
         
         # Get policy configuration
         policy = self.policy_engine.get_policy(
@@ -53,72 +170,53 @@ class CodeScanner:
             request.policy_config
         )
         
-        # Process each file
-        for file_data in request.files:
-            try:
+        # Scan files concurrently; results come back in request order. Files with
+        # identical content share one in-flight AI request through ai_memo
+        ai_memo: Dict[bytes, asyncio.Future] = {}
+        batcher = _AnalysisBatcher(self._analyze_batch_with_ai)
+        # Static rules below the threshold would be filtered out below, so they are
+        # never run (and never sent for AI fix suggestions); overrides may hold a plain string
+        severity_threshold = Severity(policy.severity_threshold)
+        file_results = await asyncio.gather(
+            *(
+                self._scan_file(file_data, request.detect_copilot, ai_memo, batcher, severity_threshold)
+                for file_data in request.files
+            ),
+            return_exceptions=True
+        )
+        # One file failing outside its engines' own handlers costs only that file
+        for index, file_result in enumerate(file_results):
+            if isinstance(file_result, BaseException):
+                logger.error(f"Scanning file {index} of {request.repository} failed: {file_result!r}")
+                file_results[index] = ([], False)
+        all_violations: List[Violation] = list(chain.from_iterable(map(itemgetter(0), file_results)))
+        copilot_detected = any(map(itemgetter(1), file_results))
+        
+        # Apply rule packs if specified and enforcement is enabled; all packs are
+        # compiled into one checker that walks each file once. Their hits go through
+        # policy filtering like every other engine's, so disabled_rules and
+        # severity_threshold apply
+        if policy.rule_packs and settings.RULE_PACK_ENFORCEMENT:
+            rule_packs = self.policy_engine.compile_rule_packs(policy.rule_packs)
+            for file_data, (_, file_is_copilot) in zip(request.files, file_results):
                 file_path = file_data.get("path", "")
-                content = file_data.get("content", "")
-                metadata = file_data.get("metadata", {})
-                
                 if not file_path:
-                    logger.warning("Skipping file with no path")
                     continue
-                
-                # Detect Copilot code
-                is_copilot = False
-                if request.detect_copilot:
-                    try:
-                        is_copilot = self.copilot_detector.detect(content, metadata)
-                        if is_copilot:
-                            copilot_detected = True
-                            logger.info(f"Copilot code detected in {file_path}")
-                    except Exception as e:
-                        logger.warning(f"Copilot detection failed for {file_path}: {e}")
-                
-                # Static analysis
-                try:
-                    static_violations = self.static_analyzer.analyze_file(
-                        file_path, content, is_copilot
-                    )
-                    all_violations.extend(static_violations)
-                except Exception as e:
-                    logger.error(f"Static analysis failed for {file_path}: {e}")
-                
-                # AI analysis (async)
                 try:
-                    ai_violations = await self.ai_analyzer.analyze_code(
-                        file_path, content, metadata, is_copilot
+                    all_violations.extend(
+                        rule_packs(file_path, file_data.get("content", ""), file_is_copilot)
                     )
-                    all_violations.extend(ai_violations)
                 except Exception as e:
-                    logger.warning(f"AI analysis failed for {file_path}: {e}")
-                    # Continue without AI analysis if it fails
-                
-                # License checking
-                try:
-                    license_violations = self.license_checker.check_file(file_path, content)
-                    all_violations.extend(license_violations)
-                except Exception as e:
-                    logger.warning(f"License checking failed for {file_path}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing file {file_data.get('path', 'unknown')}: {e}")
-                continue
+                    logger.warning(f"Rule pack check failed for {file_path}: {e}")
         
         # Apply policy filtering
         filtered_violations = self.policy_engine.filter_violations(
             all_violations, policy
         )
         
-        # Apply rule packs if specified
-        for pack_name in policy.rule_packs:
-            filtered_violations = self.policy_engine.apply_rule_pack(
-                filtered_violations, pack_name
-            )
-        
         # Determine enforcement action (with override support)
-        override_requested = getattr(request, 'override_blocking', False)
         enforcement_action, can_merge = self.policy_engine.determine_enforcement(
-            filtered_violations, policy, override_requested=override_requested
+            filtered_violations, policy, override_requested=request.override_blocking
         )
         
         # Build summary
@@ -142,24 +240,238 @@ class CodeScanner:
         
         return result
     
+    async def _scan_file(
+        self,
+        file_data: Dict[str, Any],
+        detect_copilot: bool,
+        ai_memo: Optional[Dict[bytes, asyncio.Future]] = None,
+        batcher: Optional[_AnalysisBatcher] = None,
+        severity_threshold: Severity = Severity.LOW
+    ) -> Tuple[List[Violation], bool]:
+        """Run every engine over one file; returns its violations and Copilot flag"""
+        violations: List[Violation] = []
+        is_copilot = False
+        # Only a malformed file entry can fail here; every engine below has its own handler
+        try:
+            file_path = file_data.get("path", "")
+            content = file_data.get("content", "")
+            metadata = file_data.get("metadata", {})
+        except (AttributeError, KeyError, TypeError) as e:
+            logger.error(f"Skipping malformed file entry: {e}")
+            return violations, is_copilot
+        
+        if not file_path:
+            logger.warning("Skipping file with no path")
+            return violations, is_copilot
+        
+        # Detect Copilot code
+        if detect_copilot:
+            try:
+                is_copilot = self.copilot_detector.detect(content, metadata)
+                if is_copilot:
+                    logger.debug(f"Copilot code detected in {file_path}")
+            except Exception as e:
+                logger.warning(f"Copilot detection failed for {file_path}: {e}")
+        
+        # License checking needs nothing from the other engines, so it runs in a
+        # worker thread (or process, for large files) for the whole of static and AI analysis
+        use_process = self._process_pool is not None and len(content) >= PROCESS_MIN_CHARS
+        if use_process:
+            license_check = asyncio.get_running_loop().run_in_executor(
+                self._process_pool, _license_check_worker, file_path, content
+            )
+        else:
+            license_check = asyncio.ensure_future(asyncio.to_thread(
+                self.license_checker.check_file, file_path, content
+            ))
+        
+        # Static analysis (CPU-bound, off the event loop)
+        static_violations: List[Violation] = []
+        try:
+            if use_process:
+                static_violations = await asyncio.get_running_loop().run_in_executor(
+                    self._process_pool, _static_analysis_worker, file_path, content, is_copilot, severity_threshold
+                )
+            else:
+                static_violations = await asyncio.to_thread(
+                    self.static_analyzer.analyze_file, file_path, content, is_copilot, severity_threshold
+                )
+            violations.extend(static_violations)
+        except Exception as e:
+            logger.error(f"Static analysis failed for {file_path}: {e}")
+        
+        # AI analysis and fix suggestions; skipped outright when no AI backend is configured.
+        # Whatever happens here, the license check is still awaited or cancelled below
+        try:
+            if self.ai_analyzer.enabled:
+                violations.extend(await self._ai_pass(
+                    file_path, content, metadata, is_copilot, static_violations, ai_memo, batcher
+                ))
+        except Exception as e:
+            logger.warning(f"AI analysis failed for {file_path}: {e}")
+        except BaseException:
+            license_check.cancel()
+            raise
+        
+        # License checking
+        try:
+            violations.extend(await license_check)
+        except Exception as e:
+            logger.warning(f"License checking failed for {file_path}: {e}")
+        
+        return violations, is_copilot
+    
+    async def _ai_pass(
+        self,
+        file_path: str,
+        content: str,
+        metadata: Dict[str, Any],
+        is_copilot: bool,
+        static_violations: List[Violation],
+        ai_memo: Optional[Dict[bytes, asyncio.Future]],
+        batcher: Optional[_AnalysisBatcher] = None
+    ) -> List[Violation]:
+        """AI violations for one file; with AI_FIX_SUGGESTIONS, also upgrades generic
+        static fix suggestions in place"""
+        violations: List[Violation] = []
+        
+        # Static fix suggestions stay deterministic unless AI rewrites are opted into;
+        # cheapest gate first: only collect fix candidates when there is something to enhance
+        fix_targets: List[Violation] = []
+        fix_contexts: List[str] = []
+        if settings.AI_FIX_SUGGESTIONS and static_violations:
+            fix_targets, fix_contexts = self._fix_candidates(static_violations, content)
+        
+        # Any fix suggestions beyond the first batch go out alongside the analysis
+        remaining_fixes = None
+        if len(fix_targets) > FIX_BATCH_SIZE:
+            remaining_fixes = asyncio.ensure_future(self._enhance_fix_suggestions(
+                fix_targets[FIX_BATCH_SIZE:], fix_contexts[FIX_BATCH_SIZE:]
+            ))
+        
+        # AI analysis (async, bounded so Gemini isn't flooded); the first batch
+        # of fix suggestions rides along in the same request
+        try:
+            # Fixes in a shared result belong to the first file's fix targets, so the
+            # key covers those targets: a duplicate only reuses fixes for identical ones
+            fix_signature = [(v.rule_id, v.line_number, v.fix_suggestion) for v in fix_targets]
+            memo_key = hashlib.sha256(
+                f"{is_copilot}\0{metadata!r}\0{fix_signature!r}\0{content}".encode("utf-8", "surrogatepass")
+            ).digest()
+            analysis = ai_memo.get(memo_key) if ai_memo is not None else None
+            if analysis is None:
+                if batcher is not None and not fix_targets and len(content) <= BATCH_FILE_MAX_CHARS:
+                    # Small file with no fixes to request: share a multi-file request
+                    analysis = asyncio.ensure_future(batcher.analyze(file_path, content, metadata, is_copilot))
+                else:
+                    analysis = asyncio.ensure_future(self._analyze_with_ai(
+                        file_path, content, metadata, is_copilot,
+                        fix_targets[:FIX_BATCH_SIZE], fix_contexts[:FIX_BATCH_SIZE],
+                        [v.line_number for v in static_violations]
+                    ))
+                if ai_memo is not None:
+                    ai_memo[memo_key] = analysis
+            ai_violations, fixes = await analysis
+            # Results shared with a duplicate file still name that file
+            violations.extend(
+                v if v.file_path == file_path else v.model_copy(update={"file_path": file_path})
+                for v in ai_violations
+            )
+            _apply_fixes(fix_targets, fixes)
+        except Exception as e:
+            logger.warning(f"AI analysis failed for {file_path}: {e}")
+            # Continue without AI analysis if it fails
+        
+        if remaining_fixes is not None:
+            try:
+                await remaining_fixes
+            except Exception as e:
+                logger.warning(f"Fix suggestion enhancement failed for {file_path}: {e}")
+        
+        return violations
+    
+    async def _analyze_with_ai(
+        self,
+        file_path: str,
+        content: str,
+        metadata: Dict[str, Any],
+        is_copilot: bool,
+        fix_targets: List[Violation],
+        fix_contexts: List[str],
+        hotspot_lines: List[int]
+    ) -> Tuple[List[Violation], List[Optional[str]]]:
+        """One bounded AI request: analysis plus the first batch of fixes"""
+        async with self._ai_semaphore:
+            return await self.ai_analyzer.analyze_code_with_fixes(
+                file_path, content, metadata, is_copilot,
+                fix_targets, fix_contexts,
+                hotspot_lines=hotspot_lines
+            )
+    
+    async def _analyze_batch_with_ai(
+        self,
+        files: List[Tuple[str, str, Dict[str, Any], bool]]
+    ) -> List[List[Violation]]:
+        """One bounded AI request analyzing several small files"""
+        async with self._ai_semaphore:
+            return await self.ai_analyzer.analyze_batch(files)
+    
+    def _fix_candidates(self, violations: List[Violation], content: str) -> Tuple[List[Violation], List[str]]:
+        """Violations whose fix suggestion is missing or generic, with their code contexts"""
+        # Missing suggestions need no regex; only the rest are phrase-scanned
+        to_enhance = [v for v in violations if not v.fix_suggestion]
+        to_enhance += [
+            v for v in violations
+            if v.fix_suggestion and _GENERIC_FIX_RE.search(v.fix_suggestion)
+        ]
+        if not to_enhance:
+            return [], []
+        
+        # Start offset of every line, so each context is one slice of content
+        # instead of re-joining split lines
+        offsets = [0]
+        position = content.find('\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = content.find('\n', position + 1)
+        offsets.append(len(content) + 1)
+        
+        last_line = len(offsets) - 1
+        contexts = [
+            content[
+                offsets[min(max(0, v.line_number - 1 - FIX_CONTEXT_LINES), last_line)]:
+                offsets[min(v.line_number + FIX_CONTEXT_LINES, last_line)] - 1
+            ]
+            for v in to_enhance
+        ]
+        return to_enhance, contexts
+    
+    async def _enhance_fix_suggestions(self, violations: List[Violation], contexts: List[str]):
+        """Replace fix suggestions with AI-written ones, FIX_BATCH_SIZE per request"""
+        async def enhance_batch(start: int):
+            batch = violations[start:start + FIX_BATCH_SIZE]
+            async with self._ai_semaphore:
+                fixes = await self.ai_analyzer.suggest_fixes_batch(batch, contexts[start:start + FIX_BATCH_SIZE])
+            _apply_fixes(batch, fixes)
+        
+        await asyncio.gather(*(enhance_batch(start) for start in range(0, len(violations), FIX_BATCH_SIZE)))
+    
+    async def close(self):
+        """Release network resources held by the engines, and any worker processes"""
+        await self.ai_analyzer.close()
+        if self._process_pool is not None:
+            # Waiting for the workers to exit blocks, so it happens off the event loop
+            await asyncio.to_thread(self._process_pool.shutdown, cancel_futures=True)
+    
     def _build_summary(self, violations: List[Violation]) -> Dict[str, Any]:
-        """Build summary statistics"""
-        summary = {
+        """Build summary statistics with C-level Counter roll-ups"""
+        severities = Counter(map(_severity_value, violations))
+        categories = Counter(map(_category_value, violations))
+        
+        return {
             "total_violations": len(violations),
-            "by_severity": {
-                "critical": len([v for v in violations if v.severity.value == "critical"]),
-                "high": len([v for v in violations if v.severity.value == "high"]),
-                "medium": len([v for v in violations if v.severity.value == "medium"]),
-                "low": len([v for v in violations if v.severity.value == "low"]),
-            },
-            "by_category": {},
-            "copilot_violations": len([v for v in violations if v.is_copilot_generated]),
-            "files_affected": len(set(v.file_path for v in violations))
+            "by_severity": {level: severities.get(level, 0) for level in ("critical", "high", "medium", "low")},
+            "by_category": dict(categories),
+            "copilot_violations": sum(map(_is_copilot_generated, violations)),
+            "files_affected": len(set(map(_file_path, violations)))
         }
-        
-        # Count by category
-        for violation in violations:
-            category = violation.category.value
-            summary["by_category"][category] = summary["by_category"].get(category, 0) + 1
-        
-        return summary
@@ -2,84 +2,94 @@
 AI-powered code analysis using Google Gemini API
 Enhanced for security, performance, and maintainability analysis
 """
+import asyncio
+import json
 import logging
-import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+import random
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+from typing import List, Dict, Any, Optional, Tuple
 try:
     from models.schemas import Violation, ViolationCategory, Severity
     from core.config import settings
+    from engines.ai_cache import AICache, analysis_key, fix_key, prompt_key
+    from engines.rate_limit import AdaptiveConcurrencyLimiter, TokenBudget
 except ImportError:
     from ..models.schemas import Violation, ViolationCategory, Severity
     from ..core.config import settings
+    from ..engines.ai_cache import AICache, analysis_key, fix_key, prompt_key
+    from ..engines.rate_limit import AdaptiveConcurrencyLimiter, TokenBudget
 
 logger = logging.getLogger(__name__)
 
+_violation_list = TypeAdapter(List[Violation])
+# Value -> member maps; a dict hit instead of the Enum constructor per AI violation
+_CATEGORIES = {member.value: member for member in ViolationCategory}
+_SEVERITIES = {member.value: member for member in Severity}
 
-class AIAnalyzer:
-    """AI-powered code analysis engine using Gemini for comprehensive code review"""
+# Files longer than this are sent as windows around static-analysis hotspots
+MAX_PROMPT_CONTENT_CHARS = 8000
+HOTSPOT_CONTEXT_LINES = 20
+# Anything shorter has too little code for a worthwhile AI review
+MIN_ANALYSIS_CHARS = 50
+# Copilot detection only looks at the head of the file
+COPILOT_DETECTION_CHARS = 2000
+_json_decoder = json.JSONDecoder()
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to at most limit characters, ending on a line boundary where possible"""
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    cut = head.rfind('\n')
+    return head[:cut] if cut > 0 else head
+
+
+# Copilot detection asks Gemini only when the local score falls between these
+COPILOT_SCORE_LOW = 0.15
+COPILOT_SCORE_HIGH = 0.85
+_COPILOT_MARKER_RE = re.compile(
+    r'generated by.*copilot|copilot suggestion|co-authored-by:.*github copilot', re.IGNORECASE
+)
+_IDENTIFIER_RE = re.compile(r'\b[A-Za-z_]\w*\b')
+_FUNCTION_RE = re.compile(r'^\s*(?:async\s+)?def\s', re.MULTILINE)
+_DOCSTRING_RE = re.compile(r'^\s*(?:"""|\'\'\')', re.MULTILINE)
+
+
+def _copilot_score(content: str) -> float:
+    """Cheap 0-1 likelihood that code is AI-generated, from surface features
+
+    Explicit Copilot markers score 1 and trivial or binary input 0; otherwise
+    the score blends docstring coverage, comment density and identifier length.
+    """
+    if _COPILOT_MARKER_RE.search(content):
+        return 1.0
+    if len(content) < MIN_ANALYSIS_CHARS or '\x00' in content[:1024]:
+        return 0.0
     
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
-            logger.warning("Gemini API key not configured. AI analysis will be disabled.")
-            self.enabled = False
-            return
-        
-        try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            # Use gemini-1.5-pro if available, fallback to gemini-pro
-            try:
-                self.model = genai.GenerativeModel('gemini-1.5-pro')
-                logger.info("Using Gemini 1.5 Pro")
-            except:
-                self.model = genai.GenerativeModel('gemini-pro')
-                logger.info("Using Gemini Pro")
-            self.enabled = True
-            logger.info("Gemini AI analyzer initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini: {e}")
-            self.enabled = False
+    lines = content.split('\n')
+    comment_ratio = sum(1 for line in lines if line.lstrip().startswith('#')) / len(lines)
+    functions = len(_FUNCTION_RE.findall(content))
+    docstring_ratio = min(1.0, len(_DOCSTRING_RE.findall(content)) / functions) if functions else 0.5
+    identifiers = _IDENTIFIER_RE.findall(content)
+    average_identifier = sum(map(len, identifiers)) / len(identifiers) if identifiers else 0.0
     
-    async def analyze_code(
-        self,
-        file_path: str,
-        content: str,
-        context: Optional[Dict[str, Any]] = None,
-        is_copilot: bool = False
-    ) -> List[Violation]:
-        """Analyze code using AI for contextual understanding"""
-        if not self.enabled:
-            return []
-        
-        try:
-            prompt = self._build_analysis_prompt(file_path, content, context, is_copilot)
-            response = await self._call_gemini(prompt)
-            violations = self._parse_ai_response(response, file_path, is_copilot)
-            return violations
-        except Exception as e:
-            logger.error(f"AI analysis failed for {file_path}: {e}")
-            return []
-    
-    def _build_analysis_prompt(
-        self,
-        file_path: str,
-        content: str,
-        context: Optional[Dict[str, Any]],
-        is_copilot: bool
-    ) -> str:
-        """Build the prompt for AI analysis"""
-        copilot_note = "NOTE: This code is suspected to be AI-generated (GitHub Copilot). Apply stricter security standards." if is_copilot else ""
-        
-        prompt = f"""You are an expert enterprise code reviewer analyzing code for production systems. Your analysis must be thorough, covering security, performance, maintainability, and compliance.
+    return (
+        0.4 * docstring_ratio
+        + 0.3 * min(1.0, comment_ratio / 0.3)
+        + 0.3 * min(1.0, max(0.0, (average_identifier - 4) / 8))
+    )
 
-{copilot_note}
 
-File: {file_path}
-Context: {context or "No additional context"}
-
-Code to analyze:
-```python
-{content[:8000]}  # Limit to 8000 chars for API limits
-```
+# Static part of every analysis prompt. It leads the prompt so all requests share
+# an identical prefix, which Gemini can serve from its implicit prefix cache
+ANALYSIS_INSTRUCTIONS = """You are an expert enterprise code reviewer analyzing code for production systems. Your analysis must be thorough, covering security, performance, maintainability, and compliance.
 
 **COMPREHENSIVE ANALYSIS REQUIRED:**
 
@@ -128,7 +138,7 @@ Code to analyze:
 
 **OUTPUT FORMAT (JSON array):**
 [
-  {{
+  {
     "rule_id": "AI001",
     "rule_name": "Missing Input Validation",
     "category": "security",
@@ -138,7 +148,7 @@ Code to analyze:
     "explanation": "The function accepts user input without validation, which can lead to injection attacks, data corruption, or system compromise. Input validation is a critical security control.",
     "fix_suggestion": "Add input validation: if not isinstance(value, str) or len(value) > MAX_LENGTH: raise ValueError('Invalid input')",
     "standard_mappings": ["CWE-20", "OWASP-A03:2021"]
-  }}
+  }
 ]
 
 **SEVERITY GUIDELINES:**
@@ -156,22 +166,427 @@ Code to analyze:
 - standard: Coding standards violations
 
 Return ONLY valid JSON array. If no issues found, return [].
+
+The code to review follows.
+"""
+
+# Multi-file analysis: the shared instructions once, then several small files
+BATCH_OUTPUT_FORMAT = """**MULTI-FILE OUTPUT FORMAT:**
+Several files follow, each headed by "=== FILE <n>: <path> ===". Return ONE JSON array covering all of them, and add "file_index": <n> to every object so each issue can be traced to its file. Line numbers are relative to that file.
 """
-        return prompt
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+# Generous read timeout: long prompts can take a while to generate
+GEMINI_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+# Retries on 429/5xx/network errors: exponential backoff with +/-25% jitter, so
+# concurrent analyzers that hit the limit together don't retry in lockstep. A
+# call stops retrying once the next wait would pass GEMINI_RETRY_BUDGET_SECONDS
+# from its first attempt, so one scan never waits minutes on a single file
+GEMINI_MAX_RETRIES = 8
+GEMINI_BACKOFF_BASE_SECONDS = 1.0
+GEMINI_BACKOFF_CAP_SECONDS = 300.0
+GEMINI_RETRY_BUDGET_SECONDS = 30.0
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_RETRY_DELAY_RE = re.compile(r'"retryDelay":\s*"(\d+(?:\.\d+)?)s"')
+_jitter = random.SystemRandom()
+# A fenced code block, so single fix suggestions can be unwrapped from markdown
+_CODE_BLOCK_RE = re.compile(r'```(?:[\w+-]+)?[ \t]*\n(.*?)\n```', re.DOTALL)
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before retry `attempt`; a server-provided delay wins"""
+    if response is not None:
+        retry_after = _retry_after_seconds(response.headers.get("retry-after"))
+        if retry_after is not None:
+            return min(retry_after, GEMINI_BACKOFF_CAP_SECONDS)
+        match = _RETRY_DELAY_RE.search(response.text)
+        if match:
+            return min(float(match.group(1)), GEMINI_BACKOFF_CAP_SECONDS)
+    delay = min(GEMINI_BACKOFF_CAP_SECONDS, GEMINI_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return delay * _jitter.uniform(0.75, 1.25)
+
+
+def _retry_after_seconds(retry_after: Optional[str]) -> Optional[float]:
+    """A Retry-After header, in delay-seconds or HTTP-date form, as seconds from now"""
+    if not retry_after:
+        return None
+    if retry_after.replace(".", "", 1).isdigit():
+        return float(retry_after)
+    try:
+        return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _GeminiReply(str):
+    """Response text, flagged when Gemini stopped at its output token limit"""
+    truncated = False
+
+
+_CLOSERS = {'[': ']', '{': '}'}
+
+
+def _extract_json(response: str, opener: str) -> Any:
+    """Decode the JSON value starting at the first `opener` ('[' or '{')
     
-    async def _call_gemini(self, prompt: str) -> str:
-        """Call Gemini API"""
+    The span up to the last matching closer goes straight to pydantic-core's
+    native parser. If prose trails the value, raw_decode finds its end in one
+    linear pass. A reply Gemini cut off at its output token limit is parsed
+    leniently so the complete leading items survive. Returns None when
+    nothing decodes.
+    """
+    start = response.find(opener)
+    if start == -1:
+        return None
+    end = response.rfind(_CLOSERS[opener]) + 1
+    if end > start:
         try:
-            import asyncio
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model.generate_content(prompt)
-            )
-            return response.text
+            return from_json(response[start:end])
+        except ValueError:
+            pass
+    try:
+        return _json_decoder.raw_decode(response, start)[0]
+    except json.JSONDecodeError:
+        pass
+    if opener == '[' and getattr(response, "truncated", False):
+        try:
+            # The last item is the one the cut landed in; drop it rather than keep a fragment
+            return from_json(response[start:], allow_partial=True)[:-1]
+        except ValueError:
+            pass
+    logger.error("Gemini returned malformed JSON")
+    return None
+
+
+class AIAnalyzer:
+    """AI-powered code analysis engine using Gemini for comprehensive code review"""
+    
+    def __init__(self):
+        self.cache: Optional[AICache] = None
+        if not settings.GEMINI_API_KEY:
+            logger.warning("Gemini API key not configured. AI analysis will be disabled.")
+            self.enabled = False
+            return
+        
+        try:
+            self.model_name = settings.GEMINI_MODEL
+            self._generate_url = f"{GEMINI_API_BASE}/models/{self.model_name}:generateContent"
+            # Created on first use, inside the running event loop
+            self._client: Optional[httpx.AsyncClient] = None
+            # Outstanding requests by prompt_key, so identical concurrent prompts share one call
+            self._inflight: Dict[bytes, asyncio.Future] = {}
+            # Monotonic deadline before which calls fail fast after the quota ran out
+            self._quota_resume_at = 0.0
+            # Admission control keeps us under the model's limits instead of reacting to 429s
+            self._limiter = AdaptiveConcurrencyLimiter(settings.GEMINI_MAX_CONCURRENCY)
+            self._token_budget = TokenBudget(settings.GEMINI_TOKENS_PER_MINUTE)
+            logger.info(f"Using {self.model_name}")
+            self.enabled = True
+            logger.info("Gemini AI analyzer initialized successfully")
         except Exception as e:
-            logger.error(f"Gemini API call failed: {e}")
-            raise
+            logger.error(f"Failed to initialize Gemini: {e}")
+            self.enabled = False
+            return
+        
+        if settings.AI_CACHE_PATH:
+            try:
+                self.cache = AICache(
+                    settings.AI_CACHE_PATH, settings.AI_CACHE_TTL_SECONDS, namespace=self.model_name
+                )
+            except Exception as e:
+                logger.error(f"Failed to open AI cache, continuing without it: {e}")
+    
+    async def analyze_code(
+        self,
+        file_path: str,
+        content: str,
+        context: Optional[Dict[str, Any]] = None,
+        is_copilot: bool = False,
+        hotspot_lines: Optional[List[int]] = None
+    ) -> List[Violation]:
+        """Analyze code using AI for contextual understanding"""
+        if not self.enabled or not self._worth_analyzing(file_path, content):
+            return []
+        
+        key = analysis_key(file_path, content, context, is_copilot)
+        cached = await self._cached_analysis(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._build_analysis_prompt(file_path, content, context, is_copilot, hotspot_lines)
+            response = await self._call_gemini(prompt)
+            violations = self._parse_ai_response(response, file_path, is_copilot)
+            await self._store_analysis(key, violations)
+            return violations
+        except Exception as e:
+            logger.error(f"AI analysis failed for {file_path}: {e}")
+            return []
+    
+    async def analyze_code_with_fixes(
+        self,
+        file_path: str,
+        content: str,
+        context: Optional[Dict[str, Any]],
+        is_copilot: bool,
+        fix_violations: List[Violation],
+        code_contexts: List[str],
+        hotspot_lines: Optional[List[int]] = None
+    ) -> Tuple[List[Violation], List[Optional[str]]]:
+        """Analyze code and suggest fixes for existing violations in one request
+        
+        Returns the AI violations plus one fix entry per violation in fix_violations.
+        """
+        if not fix_violations:
+            return await self.analyze_code(file_path, content, context, is_copilot, hotspot_lines), []
+        if not self.enabled:
+            return [], [None] * len(fix_violations)
+        if not self._worth_analyzing(file_path, content):
+            return [], await self.suggest_fixes_batch(fix_violations, code_contexts)
+        
+        key = analysis_key(file_path, content, context, is_copilot)
+        cached = await self._cached_analysis(key)
+        if cached is not None:
+            return cached, await self.suggest_fixes_batch(fix_violations, code_contexts)
+        
+        fixes = await self._cached_fixes(fix_violations, code_contexts)
+        pending = [index for index, fix in enumerate(fixes) if fix is None]
+        if not pending:
+            return await self.analyze_code(file_path, content, context, is_copilot, hotspot_lines), fixes
+        pending_violations = [fix_violations[index] for index in pending]
+        pending_contexts = [code_contexts[index] for index in pending]
+        
+        try:
+            prompt = f"""{self._build_analysis_prompt(file_path, content, context, is_copilot, hotspot_lines)}
+**FIX REQUESTS:**
+Static analysis already reported the issues below. Also provide a specific code fix for each one.
+
+{self._build_fix_requests(pending_violations, pending_contexts)}
+
+**COMBINED OUTPUT FORMAT:**
+Instead of a bare array, respond with a JSON object holding the array above under "violations" and one fix per issue under "fixes":
+{{"violations": [...], "fixes": [{{"index": 1, "fix": "<fixed code snippet only, no explanation>"}}]}}
+
+Return ONLY valid JSON."""
+            
+            response = await self._call_gemini(prompt)
+            data = _extract_json(response, '{')
+            if not isinstance(data, dict):
+                return [], fixes
+            
+            violations = self._parse_ai_violations(data.get("violations") or [], file_path, is_copilot)
+            pending_fixes: List[Optional[str]] = [None] * len(pending)
+            self._parse_fixes(data.get("fixes") or [], pending_fixes)
+            for index, fix in zip(pending, pending_fixes):
+                fixes[index] = fix
+            await self._store_analysis(key, violations)
+            await self._store_fixes(pending_violations, pending_contexts, pending_fixes)
+            return violations, fixes
+        except Exception as e:
+            logger.error(f"AI analysis with fixes failed for {file_path}: {e}")
+            return [], fixes
+    
+    async def analyze_batch(
+        self,
+        files: List[Tuple[str, str, Optional[Dict[str, Any]], bool]]
+    ) -> List[List[Violation]]:
+        """Analyze several small files in one request
+        
+        `files` holds (file_path, content, context, is_copilot) tuples; returns
+        one violation list per file, in order. Cached and skipped files are not
+        sent, and a lone remaining file goes through analyze_code.
+        """
+        results: List[List[Violation]] = [[] for _ in files]
+        if not self.enabled:
+            return results
+        
+        pending: List[Tuple[int, bytes]] = []
+        for index, (file_path, content, context, is_copilot) in enumerate(files):
+            if not self._worth_analyzing(file_path, content):
+                continue
+            key = analysis_key(file_path, content, context, is_copilot)
+            cached = await self._cached_analysis(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, key))
+        if not pending:
+            return results
+        if len(pending) == 1:
+            index = pending[0][0]
+            results[index] = await self.analyze_code(*files[index])
+            return results
+        
+        try:
+            response = await self._call_gemini(self._build_batch_prompt([files[index] for index, _ in pending]))
+            items = _extract_json(response, '[')
+            if not isinstance(items, list):
+                return results
+            
+            by_file: List[List[Dict[str, Any]]] = [[] for _ in pending]
+            for item in items:
+                try:
+                    position = int(item.get("file_index", -1))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+                if 0 <= position < len(pending):
+                    by_file[position].append(item)
+            
+            for (index, key), file_items in zip(pending, by_file):
+                file_path, _, _, is_copilot = files[index]
+                results[index] = self._parse_ai_violations(file_items, file_path, is_copilot)
+                await self._store_analysis(key, results[index])
+        except Exception as e:
+            logger.error(f"Batched AI analysis of {len(pending)} files failed: {e}")
+        return results
+    
+    def _build_batch_prompt(self, files: List[Tuple[str, str, Optional[Dict[str, Any]], bool]]) -> str:
+        """Shared instructions, the multi-file format note, then each file under a numbered header"""
+        sections = []
+        for position, (file_path, content, context, is_copilot) in enumerate(files):
+            copilot_note = "NOTE: suspected AI-generated (GitHub Copilot); apply stricter security standards.\n" if is_copilot else ""
+            sections.append(f"""=== FILE {position}: {file_path} ===
+{copilot_note}Context: {context or "No additional context"}
+```python
+{self._prepare_content(content)}
+```""")
+        return f"{ANALYSIS_INSTRUCTIONS}\n{BATCH_OUTPUT_FORMAT}\n" + "\n\n".join(sections) + "\n"
+    
+    def _worth_analyzing(self, file_path: str, content: str) -> bool:
+        """Cheap checks that rule out empty, tiny, binary and non-source files"""
+        if len(content) < MIN_ANALYSIS_CHARS:
+            return False
+        if '\x00' in content[:1024]:
+            return False
+        return not file_path.lower().endswith(settings.ai_skip_extensions)
+    
+    def _build_analysis_prompt(
+        self,
+        file_path: str,
+        content: str,
+        context: Optional[Dict[str, Any]],
+        is_copilot: bool,
+        hotspot_lines: Optional[List[int]] = None
+    ) -> str:
+        """Build the prompt for AI analysis: the shared instructions, then this file"""
+        copilot_note = "NOTE: This code is suspected to be AI-generated (GitHub Copilot). Apply stricter security standards.\n\n" if is_copilot else ""
+        
+        return f"""{ANALYSIS_INSTRUCTIONS}
+{copilot_note}File: {file_path}
+Context: {context or "No additional context"}
+
+Code to analyze:
+```python
+{self._prepare_content(content, hotspot_lines)}
+```
+"""
+    
+    def _prepare_content(self, content: str, hotspot_lines: Optional[List[int]] = None) -> str:
+        """Fit content into MAX_PROMPT_CONTENT_CHARS for the prompt
+        
+        Short files go through untouched. Longer ones are reduced to merged
+        windows around the hotspot lines, each headed by its line range so
+        reported line numbers stay correct; without hotspots, the file head.
+        """
+        if len(content) <= MAX_PROMPT_CONTENT_CHARS:
+            return content
+        if not hotspot_lines:
+            return _truncate(content, MAX_PROMPT_CONTENT_CHARS)
+        
+        lines = content.split('\n')
+        windows: List[List[int]] = []
+        for line_number in sorted(set(hotspot_lines)):
+            start = max(0, line_number - 1 - HOTSPOT_CONTEXT_LINES)
+            end = min(len(lines), line_number + HOTSPOT_CONTEXT_LINES)
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            elif start < end:
+                windows.append([start, end])
+        
+        excerpt = "\n".join(
+            f"# ... snip: lines {start + 1}-{end} ...\n" + "\n".join(lines[start:end])
+            for start, end in windows
+        )
+        return _truncate(excerpt, MAX_PROMPT_CONTENT_CHARS)
+    
+    async def _call_gemini(self, prompt: str) -> str:
+        """Call Gemini, sharing one request between concurrent callers with the same prompt"""
+        key = prompt_key(prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._post_gemini(prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller being cancelled does not cancel the others' request
+        return await asyncio.shield(task)
+    
+    async def _post_gemini(self, prompt: str) -> str:
+        """Call the Gemini generateContent REST endpoint, retrying transient failures"""
+        if not self._quota_ok():
+            raise RuntimeError(
+                f"Gemini quota exhausted; calls paused for {self._quota_resume_at - time.monotonic():.0f}s"
+            )
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=GEMINI_TIMEOUT,
+                headers={"x-goog-api-key": settings.GEMINI_API_KEY}
+            )
+        
+        # Rough token estimate (~4 characters per token) for the budget; one logical
+        # call is counted once, however many attempts it takes
+        estimated_tokens = len(prompt) // 4
+        await self._token_budget.reserve(estimated_tokens)
+        deadline = time.monotonic() + GEMINI_RETRY_BUDGET_SECONDS
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            response = None
+            try:
+                async with self._limiter:
+                    response = await self._client.post(
+                        self._generate_url,
+                        json={"contents": [{"parts": [{"text": prompt}]}]}
+                    )
+                delay = 0.0
+                last_attempt = True
+                if response.status_code in _RETRYABLE_STATUS:
+                    delay = _backoff_delay(attempt, response)
+                    last_attempt = attempt == GEMINI_MAX_RETRIES or time.monotonic() + delay > deadline
+                if response.status_code == 429:
+                    self._limiter.reduce()
+                    if last_attempt:
+                        # Still rate limited with no retries left: stop calling until the server's delay passes
+                        self._quota_resume_at = time.monotonic() + delay
+                if last_attempt:
+                    response.raise_for_status()
+                    candidate = response.json()["candidates"][0]
+                    reply = _GeminiReply("".join(part.get("text", "") for part in candidate["content"]["parts"]))
+                    reply.truncated = candidate.get("finishReason") == "MAX_TOKENS"
+                    return reply
+            except httpx.TransportError as e:
+                delay = _backoff_delay(attempt)
+                if attempt == GEMINI_MAX_RETRIES or time.monotonic() + delay > deadline:
+                    logger.error(f"Gemini API call failed: {e}")
+                    raise
+            except Exception as e:
+                logger.error(f"Gemini API call failed: {e}")
+                raise
+            
+            reason = f"HTTP {response.status_code}" if response is not None else "network error"
+            logger.warning(f"Gemini {reason}; retry {attempt + 1}/{GEMINI_MAX_RETRIES} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    def _quota_ok(self) -> bool:
+        return time.monotonic() >= self._quota_resume_at
+    
+    def clear_cache(self):
+        """Forget every cached AI result"""
+        if self.cache:
+            self.cache.clear()
+    
+    async def close(self):
+        """Release the HTTP connection pool"""
+        if getattr(self, "_client", None) is not None:
+            await self._client.aclose()
+            self._client = None
     
     def _parse_ai_response(
         self,
@@ -180,48 +595,73 @@ Return ONLY valid JSON array. If no issues found, return [].
         is_copilot: bool
     ) -> List[Violation]:
         """Parse AI response into Violation objects"""
-        import json
-        import re
-        
         violations = []
         
         try:
             # Extract JSON from response (handle markdown code blocks)
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                ai_violations = json.loads(json_str)
-                
-                for v in ai_violations:
-                    try:
-                        violation = Violation(
-                            rule_id=v.get("rule_id", "AI000"),
-                            rule_name=v.get("rule_name", "AI Detected Issue"),
-                            category=ViolationCategory(v.get("category", "code_quality")),
-                            severity=Severity(v.get("severity", "medium")),
-                            file_path=file_path,
-                            line_number=int(v.get("line_number", 1)),
-                            message=v.get("message", ""),
-                            explanation=v.get("explanation", ""),
-                            fix_suggestion=v.get("fix_suggestion"),
-                            standard_mappings=v.get("standard_mappings", []),
-                            is_copilot_generated=is_copilot,
-                            ai_confidence=0.85  # Default confidence for AI-detected issues
-                        )
-                        violations.append(violation)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse AI violation: {e}")
-                        continue
+            ai_violations = _extract_json(response, '[')
+            if ai_violations:
+                violations = self._parse_ai_violations(ai_violations, file_path, is_copilot)
         except Exception as e:
             logger.error(f"Failed to parse AI response: {e}")
         
         return violations
     
+    def _parse_ai_violations(
+        self,
+        ai_violations: List[Dict[str, Any]],
+        file_path: str,
+        is_copilot: bool
+    ) -> List[Violation]:
+        """Convert decoded AI violation dicts into Violation objects
+
+        The whole list is validated in one pydantic-core call; if any entry is
+        malformed, entries are validated one at a time and the bad ones dropped.
+        """
+        try:
+            return _violation_list.validate_python(
+                [self._ai_violation_fields(v, file_path, is_copilot) for v in ai_violations]
+            )
+        except (ValidationError, AttributeError):
+            pass
+        violations = []
+        for v in ai_violations:
+            try:
+                violations.append(Violation.model_validate(self._ai_violation_fields(v, file_path, is_copilot)))
+            except Exception as e:
+                logger.warning(f"Failed to parse AI violation: {e}")
+        return violations
+    
+    @staticmethod
+    def _ai_violation_fields(v: Dict[str, Any], file_path: str, is_copilot: bool) -> Dict[str, Any]:
+        """Fill defaults and map enum values for one AI violation dict"""
+        return {
+            "rule_id": v.get("rule_id", "AI000"),
+            "rule_name": v.get("rule_name", "AI Detected Issue"),
+            "category": _CATEGORIES.get(v.get("category"), ViolationCategory.CODE_QUALITY),
+            "severity": _SEVERITIES.get(v.get("severity"), Severity.MEDIUM),
+            "file_path": file_path,
+            "line_number": v.get("line_number", 1),
+            "message": v.get("message", ""),
+            "explanation": v.get("explanation", ""),
+            "fix_suggestion": v.get("fix_suggestion"),
+            "standard_mappings": v.get("standard_mappings", []),
+            "is_copilot_generated": is_copilot,
+            "ai_confidence": 0.85  # Default confidence for AI-detected issues
+        }
+    
     async def detect_copilot_code(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Detect if code was generated by Copilot"""
         if not self.enabled:
             return False
         
+        # Clear-cut cases are settled locally; only borderline code costs a Gemini call
+        score = _copilot_score(content)
+        if score >= COPILOT_SCORE_HIGH:
+            return True
+        if score <= COPILOT_SCORE_LOW:
+            return False
+        
         try:
             prompt = f"""Analyze this code and determine if it was likely generated by GitHub Copilot or similar AI coding assistant.
 
@@ -233,12 +673,17 @@ Consider:
 
 Code:
 ```python
-{content[:2000]}  # Limit to first 2000 chars
+{_truncate(content, COPILOT_DETECTION_CHARS)}
 ```
 
 Respond with only "true" or "false"."""
             
-            response = await self._call_gemini(prompt)
+            key = prompt_key(prompt)
+            response = await self.cache.aget(key) if self.cache else None
+            if response is None:
+                response = await self._call_gemini(prompt)
+                if self.cache:
+                    await self.cache.aset(key, response)
             return "true" in response.lower()
         except Exception as e:
             logger.error(f"Copilot detection failed: {e}")
@@ -249,6 +694,12 @@ Respond with only "true" or "false"."""
         if not self.enabled:
             return None
         
+        key = fix_key(violation.rule_id, violation.message, code_context)
+        if self.cache:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+        
         try:
             prompt = f"""Provide a specific code fix for this security issue:
 
@@ -265,7 +716,110 @@ Code context:
 Provide only the fixed code snippet, not explanations."""
             
             response = await self._call_gemini(prompt)
-            return response.strip()
+            code_block = _CODE_BLOCK_RE.search(response)
+            fix = (code_block.group(1) if code_block else response).strip()
+            if self.cache and fix:
+                await self.cache.aset(key, fix)
+            return fix
         except Exception as e:
             logger.error(f"Fix suggestion failed: {e}")
             return None
+    
+    async def suggest_fixes_batch(self, violations: List[Violation], code_contexts: List[str]) -> List[Optional[str]]:
+        """Get AI-suggested fixes for several violations in a single request
+        
+        Returns one entry per violation, None where no fix came back.
+        """
+        if not self.enabled or not violations:
+            return [None] * len(violations)
+        
+        fixes = await self._cached_fixes(violations, code_contexts)
+        pending = [index for index, fix in enumerate(fixes) if fix is None]
+        if not pending:
+            return fixes
+        pending_violations = [violations[index] for index in pending]
+        pending_contexts = [code_contexts[index] for index in pending]
+        
+        try:
+            prompt = f"""Provide a specific code fix for each of these issues.
+
+{self._build_fix_requests(pending_violations, pending_contexts)}
+
+Respond with a JSON array containing one object per violation:
+[{{"index": 1, "fix": "<fixed code snippet only, no explanation>"}}]
+
+Return ONLY valid JSON."""
+            
+            response = await self._call_gemini(prompt)
+            items = _extract_json(response, '[')
+            if not isinstance(items, list):
+                return fixes
+            
+            pending_fixes: List[Optional[str]] = [None] * len(pending)
+            self._parse_fixes(items, pending_fixes)
+            for index, fix in zip(pending, pending_fixes):
+                fixes[index] = fix
+            await self._store_fixes(pending_violations, pending_contexts, pending_fixes)
+        except Exception as e:
+            logger.error(f"Batched fix suggestion failed: {e}")
+        
+        return fixes
+    
+    async def _cached_analysis(self, key: bytes) -> Optional[List[Violation]]:
+        """Previously stored analyze_code result, or None on a miss"""
+        if not self.cache:
+            return None
+        cached = await self.cache.aget(key)
+        if cached is None:
+            return None
+        try:
+            return _violation_list.validate_json(cached)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached AI analysis: {e}")
+            return None
+    
+    async def _store_analysis(self, key: bytes, violations: List[Violation]):
+        if self.cache:
+            await self.cache.aset(key, _violation_list.dump_json(violations).decode())
+    
+    async def _cached_fixes(self, violations: List[Violation], code_contexts: List[str]) -> List[Optional[str]]:
+        """Previously stored fix per violation, None where there is none"""
+        if not self.cache:
+            return [None] * len(violations)
+        return list(await asyncio.gather(*(
+            self.cache.aget(fix_key(violation.rule_id, violation.message, code_context))
+            for violation, code_context in zip(violations, code_contexts)
+        )))
+    
+    async def _store_fixes(self, violations: List[Violation], code_contexts: List[str], fixes: List[Optional[str]]):
+        if not self.cache:
+            return
+        for violation, code_context, fix in zip(violations, code_contexts, fixes):
+            if fix:
+                await self.cache.aset(fix_key(violation.rule_id, violation.message, code_context), fix)
+    
+    def _build_fix_requests(self, violations: List[Violation], code_contexts: List[str]) -> str:
+        """Number each violation with its code context for a batched fix prompt"""
+        return "\n\n".join(
+            f"""Violation {index}:
+Issue: {violation.message}
+Explanation: {violation.explanation}
+File: {violation.file_path}
+Line: {violation.line_number}
+Code context:
+```python
+{code_context}
+```"""
+            for index, (violation, code_context) in enumerate(zip(violations, code_contexts), 1)
+        )
+    
+    def _parse_fixes(self, items: List[Dict[str, Any]], fixes: List[Optional[str]]):
+        """Fill fixes in place from decoded [{"index": n, "fix": ...}] items"""
+        for item in items:
+            try:
+                index = int(item.get("index", 0)) - 1
+                fix = item.get("fix")
+                if 0 <= index < len(fixes) and fix:
+                    fixes[index] = str(fix).strip()
+            except Exception as e:
+                logger.warning(f"Failed to parse batched fix suggestion: {e}")
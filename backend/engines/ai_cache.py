@@ -0,0 +1,136 @@
+"""
+Persistent SQLite cache, fronted by an in-process LRU, for Gemini results
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever prompts or response parsing change so stale entries stop matching
+PROMPT_VERSION = "v2"
+
+
+def analysis_key(file_path: str, content: str, context: Optional[Dict[str, Any]], is_copilot: bool) -> bytes:
+    """Cache key for an analyze_code result"""
+    return hashlib.sha256(
+        f"analysis\0{PROMPT_VERSION}\0{file_path}\0{is_copilot}\0{context!r}\0{content}".encode("utf-8", "surrogatepass")
+    ).digest()
+
+
+def fix_key(rule_id: str, message: str, code_context: str) -> bytes:
+    """Cache key for a single fix suggestion"""
+    return hashlib.sha256(
+        f"fix\0{PROMPT_VERSION}\0{rule_id}\0{message}\0{code_context}".encode("utf-8", "surrogatepass")
+    ).digest()
+
+
+def prompt_key(prompt: str) -> bytes:
+    """Cache key for a raw response to an exact prompt"""
+    return hashlib.sha256(f"prompt\0{PROMPT_VERSION}\0{prompt}".encode("utf-8", "surrogatepass")).digest()
+
+
+class AICache:
+    """SHA-256 keyed value store in a WAL-mode SQLite file, with TTL expiry
+
+    Recently used entries are also held in an in-process LRU so repeat hits
+    skip both SQLite and the worker thread. Stored keys are prefixed with a
+    digest of `namespace` (the model name), so switching models never serves
+    another model's answers.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        memory_size: int = 4096,
+        namespace: str = ""
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._prefix = hashlib.sha256(namespace.encode()).digest()[:8]
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache("
+            "key BLOB PRIMARY KEY, value TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._evict_expired()
+        logger.info(f"AI result cache at {path}")
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM ai_cache WHERE key = ? AND created_at >= ?",
+                (self._prefix + key, int(time.time() - self.ttl_seconds))
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: bytes, value: str):
+        """Store or replace a value"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache(key, value, created_at) VALUES (?, ?, ?)",
+                (self._prefix + key, value, int(time.time()))
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every entry, in memory and on disk"""
+        self._memory.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache")
+            self._conn.commit()
+
+    async def aget(self, key: bytes) -> Optional[str]:
+        """Memory first, then get() off the event loop; cache failures read as misses"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if created_at >= time.time() - self.ttl_seconds:
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+        try:
+            value = await asyncio.to_thread(self.get, key)
+        except Exception as e:
+            logger.warning(f"AI cache read failed: {e}")
+            return None
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    async def aset(self, key: bytes, value: str):
+        """set() off the event loop; cache failures are logged and ignored"""
+        self._remember(key, value)
+        try:
+            await asyncio.to_thread(self.set, key, value)
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    def _remember(self, key: bytes, value: str):
+        self._memory[key] = (time.time(), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_expired(self):
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM ai_cache WHERE created_at < ?",
+                (int(time.time() - self.ttl_seconds),)
+            ).rowcount
+            self._conn.commit()
+        if deleted:
+            logger.info(f"Evicted {deleted} expired AI cache entries")
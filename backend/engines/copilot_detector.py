@@ -48,8 +48,9 @@ class CopilotDetector:
         
         # Additional heuristics:
         # 1. Very verbose comments that explain obvious things (common in AI code)
-        comment_lines = [line for line in content.split('\n') if line.strip().startswith('#')]
-        if len(comment_lines) > len(content.split('\n')) * 0.3:  # More than 30% comments
+        lines = content.split('\n')
+        comment_lines = sum(1 for line in lines if line.lstrip().startswith('#'))
+        if comment_lines > len(lines) * 0.3:  # More than 30% comments
             return True
         
         # 2. Generic function names with no context
@@ -1,6 +1,7 @@
 """
 License and IP compliance checker
 """
+import hashlib
 import re
 import logging
 from typing import List, Dict, Any, Optional
@@ -26,6 +27,43 @@ class LicenseChecker:
             "BSD": r'BSD\s+License|BSD-\d',
             "Proprietary": r'Proprietary|All\s+Rights\s+Reserved|Copyright',
         }
+        # Common third-party libraries that require attribution
+        self.third_party_libs = [
+            "requests", "numpy", "pandas", "django", "flask", "tensorflow", "pytorch"
+        ]
+        
+        # Lowercase literals, one of which is part of any match of that license's
+        # pattern; a header containing none of them skips the regex
+        self.license_keywords = {
+            "MIT": ("mit",),
+            "Apache": ("apache",),
+            "GPL": ("gpl", "gnu"),
+            "BSD": ("bsd",),
+            "Proprietary": ("proprietary", "rights", "copyright"),
+        }
+        
+        # Compiled once here instead of looked up in re's cache per file and line
+        self._license_res = [
+            (license_type, self.license_keywords[license_type], re.compile(pattern, re.IGNORECASE))
+            for license_type, pattern in self.license_patterns.items()
+        ]
+        # One multi-line alternation finds every library import in a single pass;
+        # [^\S\n] is \s without the newline, so a match never spans lines
+        self._import_re = re.compile(
+            rf'^(?:import|from)[^\S\n]+({"|".join(map(re.escape, self.third_party_libs))})',
+            re.MULTILINE
+        )
+        # (message, explanation, fix_suggestion) per library, built once so every
+        # LIC002 violation for a library shares the same string objects
+        self._attribution_texts = {
+            lib: (
+                f"Third-party library '{lib}' used without attribution",
+                f"The library '{lib}' is used but not properly attributed. "
+                f"Some licenses require attribution in documentation or source code.",
+                f"Add attribution for {lib} in LICENSE or README file"
+            )
+            for lib in self.third_party_libs
+        }
     
     def check_file(self, file_path: str, content: str) -> List[Violation]:
         """Check a file for license issues"""
@@ -43,12 +81,19 @@ class LicenseChecker:
     
     def _extract_license_header(self, content: str) -> Optional[str]:
         """Extract license header from file"""
-        # Check first 50 lines for license info
-        lines = content.split('\n')[:50]
-        header = '\n'.join(lines)
+        # Check first 50 lines for license info: slice up to the 50th newline
+        # rather than splitting lines and joining them back
+        end = -1
+        for _ in range(50):
+            end = content.find('\n', end + 1)
+            if end < 0:
+                break
+        header = content[:end] if end >= 0 else content
         
-        for license_type, pattern in self.license_patterns.items():
-            if re.search(pattern, header, re.IGNORECASE):
+        # Substring screening on one lowercased copy; patterns still decide, in order
+        header_lower = header.lower()
+        for license_type, keywords, license_re in self._license_res:
+            if any(keyword in header_lower for keyword in keywords) and license_re.search(header):
                 return license_type
         
         return None
@@ -79,51 +124,49 @@ class LicenseChecker:
         """Check for third-party imports that may need attribution"""
         violations = []
         
-        # Common third-party libraries that require attribution
-        third_party_libs = [
-            "requests", "numpy", "pandas", "django", "flask", "tensorflow", "pytorch"
-        ]
-        
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            for lib in third_party_libs:
-                if re.search(rf'^import\s+{lib}|^from\s+{lib}', line):
-                    # Check if there's attribution in the file
-                    if not self._has_attribution(content, lib):
-                        violation = Violation(
-                            rule_id="LIC002",
-                            rule_name="Missing Third-Party Attribution",
-                            category=ViolationCategory.LICENSE,
-                            severity=Severity.MEDIUM,
-                            file_path=file_path,
-                            line_number=line_num,
-                            message=f"Third-party library '{lib}' used without attribution",
-                            explanation=f"The library '{lib}' is used but not properly attributed. "
-                                       f"Some licenses require attribution in documentation or source code.",
-                            fix_suggestion=f"Add attribution for {lib} in LICENSE or README file",
-                            standard_mappings=[]
-                        )
-                        violations.append(violation)
+        content_lower: Optional[str] = None
+        attributed: Dict[str, bool] = {}
+        line_num, position = 1, 0
+        for match in self._import_re.finditer(content):
+            # Advance the line count from the previous match instead of recounting from the top
+            line_num += content.count('\n', position, match.start())
+            position = match.start()
+            lib = match.group(1)
+            # Check if there's attribution in the file, lowercasing it once and only on a hit
+            if lib not in attributed:
+                if content_lower is None:
+                    content_lower = content.lower()
+                attributed[lib] = self._has_attribution(content_lower, lib)
+            if not attributed[lib]:
+                message, explanation, fix_suggestion = self._attribution_texts[lib]
+                violation = Violation(
+                    rule_id="LIC002",
+                    rule_name="Missing Third-Party Attribution",
+                    category=ViolationCategory.LICENSE,
+                    severity=Severity.MEDIUM,
+                    file_path=file_path,
+                    line_number=line_num,
+                    message=message,
+                    explanation=explanation,
+                    fix_suggestion=fix_suggestion,
+                    standard_mappings=[]
+                )
+                violations.append(violation)
         
         return violations
     
-    def _has_attribution(self, content: str, library: str) -> bool:
-        """Check if library has attribution in content"""
-        content_lower = content.lower()
-        library_lower = library.lower()
-        
-        # Check for common attribution patterns
-        attribution_patterns = [
-            rf'{library_lower}',
-            rf'attribution.*{library_lower}',
-            rf'uses.*{library_lower}',
-        ]
-        
-        for pattern in attribution_patterns:
-            if re.search(pattern, content_lower):
-                return True
-        
-        return False
+    def _has_attribution(self, content_lower: str, library: str) -> bool:
+        """Check if library has attribution in the lowercased content"""
+        # The "attribution ... <lib>" and "uses ... <lib>" patterns both contain the
+        # bare name, so a plain substring test covers all three
+        return library.lower() in content_lower
+    
+    @staticmethod
+    def fingerprint(content: str) -> str:
+        """Stable content fingerprint for check_duplicate_code's codebase_fingerprints"""
+        # Equality only, no security role: BLAKE2b is stdlib, faster than MD5, and
+        # unlike hash() stays the same across processes
+        return hashlib.blake2b(content.strip().encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
     
     def check_duplicate_code(self, file_path: str, content: str, codebase_fingerprints: Dict[str, str]) -> List[Violation]:
         """Check for duplicate or near-duplicate code (IP risk)"""
@@ -131,7 +174,7 @@ class LicenseChecker:
         
         # Simple hash-based duplicate detection
         # In production, use more sophisticated algorithms like AST comparison
-        content_hash = hash(content.strip())
+        content_hash = self.fingerprint(content)
         
         for other_file, other_hash in codebase_fingerprints.items():
             if other_file != file_path and content_hash == other_hash:
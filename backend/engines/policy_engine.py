@@ -2,26 +2,80 @@
 Policy engine for rule management and enforcement
 Supports override capability for blocking mode
 """
+import re
 import yaml
 import json
 import logging
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
 try:
-    from models.schemas import PolicyConfig, EnforcementMode, Violation, Severity
+    from models.schemas import PolicyConfig, EnforcementMode, Violation, Severity, ViolationCategory
 except ImportError:
-    from ..models.schemas import PolicyConfig, EnforcementMode, Violation, Severity
+    from ..models.schemas import PolicyConfig, EnforcementMode, Violation, Severity, ViolationCategory
 
 logger = logging.getLogger(__name__)
 
+# Constructs that mean something different on one line than in the whole file:
+# string anchors, and lookarounds, which can see past the newline without the
+# match itself crossing it. Rules using them are always checked line by line
+_LINE_SENSITIVE_RE = re.compile(r'\\[AZ]|\(\?<?[=!]')
+_line_and_rule = itemgetter(0, 1)
+
+
+def _file_hits(
+    file_pattern: re.Pattern, text: str, content: str, index: int
+) -> Optional[List[Tuple[int, int, int, str]]]:
+    """First match per line of a MULTILINE pattern run over `text`
+    
+    `text` is the content itself or a same-length lowercased copy; line text
+    for snippets always comes from `content`. Returns None when a match crosses
+    a newline, since line-by-line search would not have found it there.
+    """
+    hits = []
+    line_num, position, last_line = 1, 0, 0
+    for match in file_pattern.finditer(text):
+        start = match.start()
+        if content.find('\n', start, match.end()) != -1:
+            return None
+        line_num += content.count('\n', position, start)
+        position = start
+        if line_num != last_line:
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', start)
+            hits.append((line_num, index, start - line_start + 1, content[line_start:line_end if line_end != -1 else None]))
+            last_line = line_num
+    return hits
+
+# libyaml's C loader when PyYAML was built with it; same results, several times faster
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=256)
+def _default_policy(override_json: Optional[str]) -> PolicyConfig:
+    """Default policy with a scan request's overrides applied, shared per distinct override"""
+    policy = PolicyConfig()
+    if override_json:
+        for key, value in json.loads(override_json).items():
+            if hasattr(policy, key):
+                setattr(policy, key, value)
+    return policy
+
 
 class PolicyEngine:
     """Policy management and enforcement engine"""
     
     def __init__(self, config_path: Optional[str] = None):
         self.policies: Dict[str, PolicyConfig] = {}
+        # repository -> (policy file mtime or None if absent, parsed policy)
+        self._file_policies: Dict[str, Tuple[Optional[float], Optional[PolicyConfig]]] = {}
+        self._compiled_rule_packs: Dict[str, List[tuple]] = {}
         self.rule_packs: Dict[str, Dict[str, Any]] = {}
         self.config_path = config_path or "config/policies"
+        self._config_base = Path(self.config_path)
+        # Response body for GET /rule-packs, rebuilt only when rule packs change
+        self.rule_packs_summary: Dict[str, Any] = {"rule_packs": [], "details": {}}
         self._load_rule_packs()
     
     def _load_rule_packs(self):
@@ -34,36 +88,65 @@ class PolicyEngine:
         for pack_file in rule_pack_dir.glob("*.yaml"):
             try:
                 with open(pack_file, 'r') as f:
-                    pack_data = yaml.safe_load(f)
+                    pack_data = yaml.load(f, Loader=_YamlLoader)
                     pack_name = pack_file.stem
                     self.rule_packs[pack_name] = pack_data
                     logger.info(f"Loaded rule pack: {pack_name}")
             except Exception as e:
                 logger.error(f"Failed to load rule pack {pack_file}: {e}")
+        
+        self._publish_rule_packs_summary()
+    
+    def _publish_rule_packs_summary(self):
+        """Rebuild the rule pack listing and swap it in with a single assignment"""
+        self.rule_packs_summary = {
+            "rule_packs": list(self.rule_packs.keys()),
+            "details": {
+                name: {
+                    "name": pack.get("name", name),
+                    "description": pack.get("description", ""),
+                    "rules_count": len(pack.get("rules", []))
+                }
+                for name, pack in self.rule_packs.items()
+            }
+        }
     
     def get_policy(self, repository: str, override: Optional[Dict[str, Any]] = None) -> PolicyConfig:
         """Get policy configuration for a repository"""
-        # Check for repository-specific policy
-        repo_policy_path = Path(f"{self.config_path}/{repository}.yaml")
-        
-        if repo_policy_path.exists():
-            try:
-                with open(repo_policy_path, 'r') as f:
-                    policy_data = yaml.safe_load(f)
-                    return PolicyConfig(**policy_data)
-            except Exception as e:
-                logger.error(f"Failed to load policy for {repository}: {e}")
+        # Policies set through the API take precedence over files on disk
+        policy = self.policies.get(repository)
+        if policy is not None:
+            return policy
         
-        # Use default policy
-        default_policy = PolicyConfig()
+        # Check for repository-specific policy; the parsed file (or its absence) is
+        # cached and only re-read when a stat shows its mtime changed
+        repo_policy_path = self._config_base / f"{repository}.yaml"
+        try:
+            mtime: Optional[float] = repo_policy_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        cached = self._file_policies.get(repository)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, self._load_policy_file(repository, repo_policy_path) if mtime is not None else None)
+            self._file_policies[repository] = cached
+        policy = cached[1]
+        if policy is not None:
+            return policy
         
-        # Apply override if provided
-        if override:
-            for key, value in override.items():
-                if hasattr(default_policy, key):
-                    setattr(default_policy, key, value)
-        
-        return default_policy
+        # Use default policy, with the override applied if provided; overrides come
+        # from JSON request bodies, so their canonical JSON form is the cache key.
+        # Callers get their own copy, so mutating it never changes the cached default
+        return _default_policy(json.dumps(override, sort_keys=True) if override else None).model_copy(deep=True)
+    
+    def _load_policy_file(self, repository: str, repo_policy_path: Path) -> Optional[PolicyConfig]:
+        """Parse a repository's config/policies/<repository>.yaml"""
+        try:
+            with open(repo_policy_path, 'r') as f:
+                policy_data = yaml.load(f, Loader=_YamlLoader)
+                return PolicyConfig(**policy_data)
+        except Exception as e:
+            logger.error(f"Failed to load policy for {repository}: {e}")
+            return None
     
     def filter_violations(
         self,
@@ -71,25 +154,18 @@ class PolicyEngine:
         policy: PolicyConfig
     ) -> List[Violation]:
         """Filter violations based on policy configuration"""
-        filtered = []
-        
-        for violation in violations:
-            # Check if rule is enabled
-            if policy.enabled_rules and violation.rule_id not in policy.enabled_rules:
-                continue
-            
-            # Check if rule is disabled
-            if violation.rule_id in policy.disabled_rules:
-                continue
-            
-            # Check severity threshold
-            severity_order = [Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL]
-            if severity_order.index(violation.severity) < severity_order.index(policy.severity_threshold):
-                continue
-            
-            filtered.append(violation)
+        # Policy lists come from YAML/JSON; look them up as sets
+        enabled = frozenset(policy.enabled_rules)
+        disabled = frozenset(policy.disabled_rules)
+        # Overrides are set without validation, so the threshold may be a plain string
+        threshold = Severity(policy.severity_threshold).rank
         
-        return filtered
+        return [
+            violation for violation in violations
+            if (not enabled or violation.rule_id in enabled)
+            and violation.rule_id not in disabled
+            and violation.severity.rank >= threshold
+        ]
     
     def determine_enforcement(
         self,
@@ -110,13 +186,21 @@ class PolicyEngine:
         if not violations:
             return EnforcementMode.ADVISORY, True
         
-        # Check for critical violations
-        critical_violations = [v for v in violations if v.severity == Severity.CRITICAL]
-        high_violations = [v for v in violations if v.severity == Severity.HIGH]
-        
-        # Apply stricter rules for Copilot-generated code
-        copilot_violations = [v for v in violations if v.is_copilot_generated]
-        copilot_critical = [v for v in copilot_violations if v.severity == Severity.CRITICAL]
+        # Tally critical and high violations in one pass; Copilot-generated
+        # critical violations get stricter treatment below
+        critical_violations = False
+        copilot_critical = False
+        high_count = 0
+        for v in violations:
+            if v.severity == Severity.CRITICAL:
+                critical_violations = True
+                if v.is_copilot_generated:
+                    # Nothing later in the list can change the outcome
+                    copilot_critical = True
+                    break
+            elif v.severity == Severity.HIGH:
+                high_count += 1
+        high_violations = high_count > 0
         
         if policy.enforcement_mode == EnforcementMode.BLOCKING:
             # Check if override is allowed and requested
@@ -132,7 +216,7 @@ class PolicyEngine:
                 return EnforcementMode.BLOCKING, False
             
             # Block on critical violations or multiple high violations
-            if critical_violations or (high_violations and len(high_violations) > 3):
+            if critical_violations or high_count > 3:
                 return EnforcementMode.BLOCKING, False
             elif high_violations:
                 return EnforcementMode.WARNING, True
@@ -146,20 +230,97 @@ class PolicyEngine:
         else:  # ADVISORY
             return EnforcementMode.ADVISORY, True
     
-    def apply_rule_pack(self, violations: List[Violation], pack_name: str) -> List[Violation]:
-        """Apply additional rules from a rule pack"""
-        if pack_name not in self.rule_packs:
-            logger.warning(f"Rule pack not found: {pack_name}")
+    def compile_rule_packs(self, pack_names: List[str]) -> Callable[[str, str, bool], List[Violation]]:
+        """Compile rule packs into one checker for (file_path, content, is_copilot)
+        
+        Each pack's patterns are compiled once and cached. The checker runs each
+        rule with one finditer over the whole file, keeping the first match per
+        line, and only falls back to line-by-line search for a rule whose match
+        spans lines or whose pattern depends on line boundaries.
+        """
+        rules = [rule for pack_name in pack_names for rule in self._compile_rule_pack(pack_name)]
+        
+        def check(file_path: str, content: str, is_copilot: bool) -> List[Violation]:
+            violations = []
+            if not rules:
+                return violations
+            
+            # (line_num, rule index, column, line) per hit; sorted afterwards into
+            # the line-major, rule-minor order a line-by-line walk would give
+            hits: List[Tuple[int, int, int, str]] = []
+            lines: Optional[List[str]] = None
+            # Case-insensitive rules run case-sensitively over a lowercased copy, which
+            # lets sre use its fast literal scans; ASCII keeps offsets and folding exact
+            content_lower = content.lower() if content.isascii() else None
+            for index, (file_pattern, folded_pattern, pattern, *_) in enumerate(rules):
+                if file_pattern is not None:
+                    if folded_pattern is not None and content_lower is not None:
+                        rule_hits = _file_hits(folded_pattern, content_lower, content, index)
+                    else:
+                        rule_hits = _file_hits(file_pattern, content, content, index)
+                    if rule_hits is not None:
+                        hits.extend(rule_hits)
+                        continue
+                if lines is None:
+                    lines = content.split('\n')
+                for line_num, line in enumerate(lines, 1):
+                    match = pattern.search(line)
+                    if match:
+                        hits.append((line_num, index, match.start() + 1, line))
+            
+            hits.sort(key=_line_and_rule)
+            for line_num, index, column, line in hits:
+                _, _, _, rule_id, rule_name, category, severity, message, explanation, mappings = rules[index]
+                violations.append(Violation(
+                    rule_id=rule_id,
+                    rule_name=rule_name,
+                    category=category,
+                    severity=severity,
+                    file_path=file_path,
+                    line_number=line_num,
+                    column_number=column,
+                    message=message,
+                    explanation=explanation,
+                    standard_mappings=mappings,
+                    code_snippet=line.strip(),
+                    is_copilot_generated=is_copilot
+                ))
             return violations
         
-        pack = self.rule_packs[pack_name]
-        additional_violations = []
+        return check
+    
+    def _compile_rule_pack(self, pack_name: str) -> List[tuple]:
+        """Compiled rule tuples for one pack, cached per pack name"""
+        compiled = self._compiled_rule_packs.get(pack_name)
+        if compiled is not None:
+            return compiled
+        
+        if pack_name not in self.rule_packs:
+            logger.warning(f"Rule pack not found: {pack_name}")
+            return []
         
-        # Apply custom rules from pack
-        custom_rules = pack.get("rules", [])
-        for rule in custom_rules:
-            # Rule application logic would go here
-            # This is a placeholder for rule pack rule execution
-            pass
+        compiled = []
+        for rule in self.rule_packs[pack_name].get("rules", []) or []:
+            try:
+                rule_name = rule.get("name", rule["id"])
+                pattern = rule["pattern"].strip()
+                line_sensitive = _LINE_SENSITIVE_RE.search(pattern)
+                # A leading (?i) with nothing uppercase after it matches lowercased text the same way
+                folded = pattern[4:] if pattern.startswith("(?i)") and pattern[4:] == pattern[4:].lower() else None
+                compiled.append((
+                    None if line_sensitive else re.compile(pattern, re.MULTILINE),
+                    None if line_sensitive or folded is None else re.compile(folded, re.MULTILINE),
+                    re.compile(pattern),
+                    rule["id"],
+                    rule_name,
+                    ViolationCategory(rule.get("category", "compliance")),
+                    Severity(rule.get("severity", "medium")),
+                    f"{rule_name} ({pack_name} rule pack)",
+                    rule.get("explanation", ""),
+                    rule.get("standard_mappings", [])
+                ))
+            except Exception as e:
+                logger.error(f"Skipping invalid rule {rule.get('id', '?')} in pack {pack_name}: {e}")
         
-        return violations + additional_violations
+        self._compiled_rule_packs[pack_name] = compiled
+        return compiled
@@ -0,0 +1,77 @@
+"""
+Client-side admission control for Gemini requests
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps in-flight requests; the cap halves for a cool-down period after a 429"""
+
+    def __init__(self, max_concurrency: int, cooldown_seconds: float = 60.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.cooldown_seconds = cooldown_seconds
+        self._in_flight = 0
+        self._reduced_until = 0.0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        if time.monotonic() < self._reduced_until:
+            return max(1, self.max_concurrency // 2)
+        return self.max_concurrency
+
+    def reduce(self):
+        """Halve the cap for cooldown_seconds (called when the server rate-limits us)"""
+        if time.monotonic() >= self._reduced_until:
+            logger.warning(f"Rate limited; concurrency reduced to {max(1, self.max_concurrency // 2)} "
+                           f"for {self.cooldown_seconds:.0f}s")
+        self._reduced_until = time.monotonic() + self.cooldown_seconds
+
+    async def __aenter__(self):
+        async with self._condition:
+            while self._in_flight >= self.limit:
+                # Re-check periodically so the cap recovers when the cool-down ends
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+
+class TokenBudget:
+    """Rolling one-minute token budget; reserve() waits until the request fits"""
+
+    def __init__(self, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self._reservations: Deque[Tuple[float, int]] = deque()
+        self._used = 0
+        self._lock = asyncio.Lock()
+
+    async def reserve(self, tokens: int):
+        """Block until `tokens` fit in the window, then record them"""
+        if self.tokens_per_minute <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._reservations and self._reservations[0][0] <= now - self.window_seconds:
+                    self._used -= self._reservations.popleft()[1]
+                # An oversized request still goes through once the window is empty
+                if not self._reservations or self._used + tokens <= self.tokens_per_minute:
+                    self._reservations.append((now, tokens))
+                    self._used += tokens
+                    return
+                await asyncio.sleep(self._reservations[0][0] + self.window_seconds - now)
@@ -2,8 +2,12 @@
 Static analysis engine for security and compliance patterns
 """
 import re
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 try:
     from models.schemas import Violation, ViolationCategory, Severity
 except ImportError:
@@ -11,20 +15,119 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+_check_line_and_pattern = itemgetter(0, 1, 2)
+
+# Files with a NUL this early are binary and not scanned at all
+BINARY_SNIFF_CHARS = 8192
+# The SQL injection and unsafe-operation patterns cap how far they look past the
+# opening parenthesis, so one huge line (minified bundles, data blobs) can't make
+# them backtrack quadratically; every line is still scanned
+MAX_ARG_CHARS = 512
+# An uppercase escape (\S, \W, \D, \B, ...) means something else once lowercased
+_UPPER_ESCAPE_RE = re.compile(r'\\[A-Z]')
+# Scan results kept per content digest, most recently used last
+HITS_CACHE_SIZE = 2048
+# (?i) matches dotless i and long s as "i" and "s", which lower() leaves alone;
+# keyword checks on non-ASCII files fold them first so no live pattern is skipped
+_KEYWORD_FOLD = str.maketrans({'\u0131': 'i', '\u017f': 's'})
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """The lines of text.split('\\n'), one at a time instead of as a list"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _file_matches(
+    pattern: re.Pattern, content: str, first_only: bool, search_text: Optional[str] = None
+) -> Optional[List[Tuple[int, int, str]]]:
+    """(line_num, column, line) for each match of `pattern` over the whole file
+    
+    Gives what running the pattern on every line of content.split('\n') would:
+    search() with first_only, finditer() otherwise. Returns None when a match
+    crosses a newline, since a line-by-line scan would not have found it.
+    `search_text`, when given, is a same-length lowercased copy to match
+    against; line text still comes from `content`.
+    """
+    hits = []
+    # Bound methods as locals: this loop runs once per match
+    append, find, count, rfind = hits.append, content.find, content.count, content.rfind
+    line_num, position, last_line = 1, 0, 0
+    line_start, line = 0, ""
+    for match in pattern.finditer(content if search_text is None else search_text):
+        start, end = match.span()
+        if find('\n', start, end) >= 0:
+            return None
+        if start > position:
+            newlines = count('\n', position, start)
+            if newlines:
+                line_num += newlines
+                line_start = rfind('\n', 0, start) + 1
+            position = start
+        if line_num != last_line:
+            line_end = find('\n', start)
+            line = content[line_start:line_end] if line_end >= 0 else content[line_start:]
+            last_line = line_num
+        elif first_only:
+            continue
+        append((line_num, start - line_start, line))
+    return hits
+
+
+def _line_matches(pattern: re.Pattern, content: str, first_only: bool) -> List[Tuple[int, int, str]]:
+    """_file_matches, line by line, for patterns whose matches can cross newlines"""
+    hits = []
+    for line_num, line in enumerate(_iter_lines(content), 1):
+        if first_only:
+            match = pattern.search(line)
+            if match:
+                hits.append((line_num, match.start(), line))
+        else:
+            hits.extend((line_num, match.start(), line) for match in pattern.finditer(line))
+    return hits
+
 
 class StaticAnalyzer:
     """Static code analysis engine"""
     
     def __init__(self):
+        self._hits_cache: "OrderedDict[Tuple[bytes, int], tuple]" = OrderedDict()
+        self._hits_lock = threading.Lock()
         self.secret_patterns = self._load_secret_patterns()
         self.sql_injection_patterns = self._load_sql_injection_patterns()
         self.unsafe_patterns = self._load_unsafe_patterns()
+        # Compile once here rather than going through re's pattern cache on every line.
+        # Each pattern's "keywords" are lowercase literals, one of which is part of
+        # any match, so a file containing none of them cannot match that pattern
+        for pattern_config in (*self.secret_patterns, *self.sql_injection_patterns, *self.unsafe_patterns):
+            pattern_config["compiled"] = re.compile(pattern_config["pattern"])
+            # A (?i) pattern, lowercased, matches lowercased ASCII text exactly as the
+            # original matches the text; without (?i) sre can use its fast literal scans
+            rest = pattern_config["pattern"][4:]
+            folded = pattern_config["pattern"].startswith("(?i)") and not _UPPER_ESCAPE_RE.search(rest)
+            pattern_config["folded"] = re.compile(rest.lower()) if folded else None
+        # (message, explanation, fix_suggestion) depend only on the rule and on whether
+        # the code is AI-generated, so both variants are formatted once per rule here
+        for patterns, texts in (
+            (self.secret_patterns, self._secret_texts),
+            (self.sql_injection_patterns, self._sql_injection_texts),
+            (self.unsafe_patterns, self._unsafe_texts),
+        ):
+            for pattern_config in patterns:
+                pattern_config["texts"] = {is_copilot: texts(pattern_config, is_copilot) for is_copilot in (False, True)}
     
     def _load_secret_patterns(self) -> List[Dict[str, Any]]:
         """Load patterns for detecting hardcoded secrets"""
         return [
             {
                 "pattern": r'(?i)(api[_-]?key|apikey)\s*[=:]\s*["\']([^"\']{20,})["\']',
+                "keywords": ("api",),
                 "rule_id": "SEC001",
                 "rule_name": "Hardcoded API Key",
                 "category": ViolationCategory.SECURITY,
@@ -33,6 +136,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(password|passwd|pwd)\s*[=:]\s*["\']([^"\']+)["\']',
+                "keywords": ("pass", "pwd"),
                 "rule_id": "SEC002",
                 "rule_name": "Hardcoded Password",
                 "category": ViolationCategory.SECURITY,
@@ -41,6 +145,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(secret|secret[_-]?key)\s*[=:]\s*["\']([^"\']{20,})["\']',
+                "keywords": ("secret",),
                 "rule_id": "SEC003",
                 "rule_name": "Hardcoded Secret",
                 "category": ViolationCategory.SECURITY,
@@ -49,6 +154,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(aws[_-]?access[_-]?key[_-]?id|aws[_-]?secret[_-]?access[_-]?key)\s*[=:]\s*["\']([^"\']+)["\']',
+                "keywords": ("aws",),
                 "rule_id": "SEC004",
                 "rule_name": "Hardcoded AWS Credentials",
                 "category": ViolationCategory.SECURITY,
@@ -57,6 +163,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'sk_live_[0-9a-zA-Z]{24,}',
+                "keywords": ("sk_live_",),
                 "rule_id": "SEC005",
                 "rule_name": "Stripe Live Secret Key",
                 "category": ViolationCategory.SECURITY,
@@ -65,6 +172,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(token|bearer[_-]?token)\s*[=:]\s*["\']([^"\']{20,})["\']',
+                "keywords": ("token",),
                 "rule_id": "SEC006",
                 "rule_name": "Hardcoded Token",
                 "category": ViolationCategory.SECURITY,
@@ -73,6 +181,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(private[_-]?key|privatekey)\s*[=:]\s*["\']([^"\']{20,})["\']',
+                "keywords": ("private",),
                 "rule_id": "SEC007",
                 "rule_name": "Hardcoded Private Key",
                 "category": ViolationCategory.SECURITY,
@@ -81,6 +190,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'-----BEGIN\s+(RSA\s+)?PRIVATE\s+KEY-----',
+                "keywords": ("-----begin",),
                 "rule_id": "SEC008",
                 "rule_name": "Hardcoded Private Key (PEM Format)",
                 "category": ViolationCategory.SECURITY,
@@ -89,6 +199,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)(database[_-]?url|db[_-]?password|connection[_-]?string)\s*[=:]\s*["\']([^"\']*://[^"\']+)["\']',
+                "keywords": ("database", "db", "connection"),
                 "rule_id": "SEC009",
                 "rule_name": "Hardcoded Database Credentials",
                 "category": ViolationCategory.SECURITY,
@@ -101,7 +212,8 @@ class StaticAnalyzer:
         """Load patterns for detecting SQL injection risks"""
         return [
             {
-                "pattern": r'(?i)(execute|query|exec)\s*\([^)]*\+.*["\']',
+                "pattern": r'(?i)(execute|query|exec)\s*\([^)+]{0,%d}\+[^"\'\n]{0,%d}["\']' % (MAX_ARG_CHARS, MAX_ARG_CHARS),
+                "keywords": ("exec", "query"),
                 "rule_id": "SEC101",
                 "rule_name": "Potential SQL Injection (String Concatenation)",
                 "category": ViolationCategory.SECURITY,
@@ -109,7 +221,8 @@ class StaticAnalyzer:
                 "standard_mappings": ["CWE-89", "OWASP-A03:2021"]
             },
             {
-                "pattern": r'(?i)(execute|query|exec)\s*\([^)]*f["\']',
+                "pattern": r'(?i)(execute|query|exec)\s*\([^)]{0,%d}f["\']' % MAX_ARG_CHARS,
+                "keywords": ("exec", "query"),
                 "rule_id": "SEC102",
                 "rule_name": "Potential SQL Injection (F-string)",
                 "category": ViolationCategory.SECURITY,
@@ -117,7 +230,8 @@ class StaticAnalyzer:
                 "standard_mappings": ["CWE-89", "OWASP-A03:2021"]
             },
             {
-                "pattern": r'(?i)(execute|query|exec)\s*\([^)]*\.format\(',
+                "pattern": r'(?i)(execute|query|exec)\s*\([^)]{0,%d}\.format\(' % MAX_ARG_CHARS,
+                "keywords": ("exec", "query"),
                 "rule_id": "SEC103",
                 "rule_name": "Potential SQL Injection (String Format)",
                 "category": ViolationCategory.SECURITY,
@@ -131,6 +245,7 @@ class StaticAnalyzer:
         return [
             {
                 "pattern": r'eval\s*\(',
+                "keywords": ("eval",),
                 "rule_id": "SEC201",
                 "rule_name": "Use of eval()",
                 "category": ViolationCategory.SECURITY,
@@ -139,6 +254,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'exec\s*\(',
+                "keywords": ("exec",),
                 "rule_id": "SEC202",
                 "rule_name": "Use of exec()",
                 "category": ViolationCategory.SECURITY,
@@ -146,7 +262,8 @@ class StaticAnalyzer:
                 "standard_mappings": ["CWE-95", "OWASP-A03:2021"]
             },
             {
-                "pattern": r'(?i)subprocess\.(call|run|Popen)\s*\([^)]*shell\s*=\s*True',
+                "pattern": r'(?i)subprocess\.(call|run|Popen)\s*\([^)]{0,%d}shell\s*=\s*True' % MAX_ARG_CHARS,
+                "keywords": ("subprocess",),
                 "rule_id": "SEC203",
                 "rule_name": "Unsafe Shell Execution",
                 "category": ViolationCategory.SECURITY,
@@ -155,6 +272,7 @@ class StaticAnalyzer:
             },
             {
                 "pattern": r'(?i)pickle\.(loads?|dumps?)\s*\(',
+                "keywords": ("pickle",),
                 "rule_id": "SEC204",
                 "rule_name": "Unsafe Deserialization",
                 "category": ViolationCategory.SECURITY,
@@ -162,7 +280,8 @@ class StaticAnalyzer:
                 "standard_mappings": ["CWE-502", "OWASP-A08:2021"]
             },
             {
-                "pattern": r'(?i)open\s*\([^)]*\.\./',
+                "pattern": r'(?i)open\s*\([^)]{0,%d}\.\./' % MAX_ARG_CHARS,
+                "keywords": ("open",),
                 "rule_id": "SEC205",
                 "rule_name": "Path Traversal Risk",
                 "category": ViolationCategory.SECURITY,
@@ -171,95 +290,187 @@ class StaticAnalyzer:
             }
         ]
     
-    def analyze_file(self, file_path: str, content: str, is_copilot: bool = False) -> List[Violation]:
-        """Analyze a single file for violations"""
-        violations = []
-        lines = content.split('\n')
+    def analyze_file(
+        self,
+        file_path: str,
+        content: str,
+        is_copilot: bool = False,
+        severity_threshold: Severity = Severity.LOW
+    ) -> List[Violation]:
+        """Analyze a single file for violations
         
-        # Check for secrets
-        violations.extend(self._check_secrets(file_path, lines, is_copilot))
+        Each live pattern runs once over the whole file; results keep the
+        per-check order (secrets, then SQL injection, then unsafe patterns),
+        and within a check are ordered by line, then pattern. Rules below
+        severity_threshold are not run at all.
+        """
+        # Hits depend only on the content, so a re-scanned file (a new push to the
+        # same PR, a retried webhook) skips the regex work; path and Copilot flag
+        # are applied when the violations are built
+        min_rank = severity_threshold.rank
+        key = (hashlib.sha256(content.encode("utf-8", "surrogatepass")).digest(), min_rank)
+        with self._hits_lock:
+            hits = self._hits_cache.get(key)
+            if hits is not None:
+                self._hits_cache.move_to_end(key)
+        if hits is None:
+            hits = self._find_hits(content, min_rank)
+            with self._hits_lock:
+                self._hits_cache[key] = hits
+                while len(self._hits_cache) > HITS_CACHE_SIZE:
+                    self._hits_cache.popitem(last=False)
+        
+        violations: List[Violation] = []
+        append = violations.append
+        secret_violation, sql_injection_violation, unsafe_violation = (
+            self._secret_violation, self._sql_injection_violation, self._unsafe_violation
+        )
+        for check, line_num, column, line, pattern_config in hits:
+            if check == 0:
+                append(secret_violation(pattern_config, file_path, line_num, line, column, is_copilot))
+            elif check == 1:
+                append(sql_injection_violation(pattern_config, file_path, line_num, line, is_copilot))
+            else:
+                append(unsafe_violation(pattern_config, file_path, line_num, line, is_copilot))
+        return violations
+    
+    def _find_hits(self, content: str, min_rank: int) -> Tuple[Tuple[int, int, int, str, Dict[str, Any]], ...]:
+        """(check, line_num, column, line, pattern_config) per match, in report order"""
+        if '\x00' in content[:BINARY_SNIFF_CHARS]:
+            return ()
         
-        # Check for SQL injection
-        violations.extend(self._check_sql_injection(file_path, lines, is_copilot))
+        # One lowercase copy and a few substring searches rule out, per file,
+        # every pattern whose keywords are absent; most files keep none or few
+        content_lower = content.lower()
+        # Lowercasing keeps offsets only for ASCII; other files run the (?i) patterns
+        ascii_content = content.isascii()
+        keyword_text = content_lower if ascii_content else content_lower.translate(_KEYWORD_FOLD)
+        secret_patterns = self._live_patterns(self.secret_patterns, keyword_text, min_rank)
+        sql_injection_patterns = self._live_patterns(self.sql_injection_patterns, keyword_text, min_rank)
+        unsafe_patterns = self._live_patterns(self.unsafe_patterns, keyword_text, min_rank)
+        if not (secret_patterns or sql_injection_patterns or unsafe_patterns):
+            return ()
         
-        # Check for unsafe patterns
-        violations.extend(self._check_unsafe_patterns(file_path, lines, is_copilot))
+        # (check, line_num, pattern index, column, line); secrets report every
+        # match on a line, the other checks only whether a line matches
+        checks = (secret_patterns, sql_injection_patterns, unsafe_patterns)
+        hits: List[Tuple[int, int, int, int, str]] = []
+        for check, patterns in enumerate(checks):
+            first_only = check > 0
+            for index, pattern_config in enumerate(patterns):
+                if ascii_content and pattern_config["folded"] is not None:
+                    found = _file_matches(pattern_config["folded"], content, first_only, content_lower)
+                else:
+                    found = _file_matches(pattern_config["compiled"], content, first_only)
+                if found is None:
+                    found = _line_matches(pattern_config["compiled"], content, first_only)
+                hits.extend((check, line_num, index, column, line) for line_num, column, line in found)
         
-        return violations
+        # Stable sort: matches of one pattern on one line stay in column order
+        hits.sort(key=_check_line_and_pattern)
+        return tuple(
+            (check, line_num, column, line, checks[check][index])
+            for check, line_num, index, column, line in hits
+        )
     
-    def _check_secrets(self, file_path: str, lines: List[str], is_copilot: bool) -> List[Violation]:
-        """Check for hardcoded secrets"""
-        violations = []
-        for line_num, line in enumerate(lines, 1):
-            for pattern_config in self.secret_patterns:
-                matches = re.finditer(pattern_config["pattern"], line)
-                for match in matches:
-                    violation = Violation(
-                        rule_id=pattern_config["rule_id"],
-                        rule_name=pattern_config["rule_name"],
-                        category=pattern_config["category"],
-                        severity=pattern_config["severity"],
-                        file_path=file_path,
-                        line_number=line_num,
-                        column_number=match.start() + 1,
-                        message=f"Hardcoded secret detected: {pattern_config['rule_name']}",
-                        explanation=f"This code contains a hardcoded secret which is a critical security risk. "
-                                   f"Secrets should be stored in environment variables or secret management systems. "
-                                   f"{'This appears to be AI-generated code, which may have introduced this vulnerability.' if is_copilot else ''}",
-                        fix_suggestion="Use environment variables or a secrets manager (e.g., AWS Secrets Manager, HashiCorp Vault)",
-                        standard_mappings=pattern_config["standard_mappings"],
-                        code_snippet=line.strip(),
-                        is_copilot_generated=is_copilot
-                    )
-                    violations.append(violation)
-        return violations
+    @staticmethod
+    def _live_patterns(patterns: List[Dict[str, Any]], content_lower: str, min_rank: int) -> List[Dict[str, Any]]:
+        """The patterns at or above min_rank that can match somewhere in the file"""
+        return [
+            p for p in patterns
+            if p["severity"].rank >= min_rank and any(keyword in content_lower for keyword in p["keywords"])
+        ]
     
-    def _check_sql_injection(self, file_path: str, lines: List[str], is_copilot: bool) -> List[Violation]:
-        """Check for SQL injection patterns"""
-        violations = []
-        for line_num, line in enumerate(lines, 1):
-            for pattern_config in self.sql_injection_patterns:
-                if re.search(pattern_config["pattern"], line):
-                    violation = Violation(
-                        rule_id=pattern_config["rule_id"],
-                        rule_name=pattern_config["rule_name"],
-                        category=pattern_config["category"],
-                        severity=pattern_config["severity"],
-                        file_path=file_path,
-                        line_number=line_num,
-                        message="Potential SQL injection vulnerability detected",
-                        explanation=f"SQL queries constructed using string concatenation or formatting are vulnerable to SQL injection attacks. "
-                                   f"Use parameterized queries or ORM methods instead. "
-                                   f"{'This AI-generated code may not have considered security best practices.' if is_copilot else ''}",
-                        fix_suggestion="Use parameterized queries: cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))",
-                        standard_mappings=pattern_config["standard_mappings"],
-                        code_snippet=line.strip(),
-                        is_copilot_generated=is_copilot
-                    )
-                    violations.append(violation)
-        return violations
+    @staticmethod
+    def _secret_texts(pattern_config: Dict[str, Any], is_copilot: bool) -> Tuple[str, str, str]:
+        """Message, explanation and fix suggestion for a hardcoded secret"""
+        return (
+            f"Hardcoded secret detected: {pattern_config['rule_name']}",
+            f"This code contains a hardcoded secret which is a critical security risk. "
+            f"Secrets should be stored in environment variables or secret management systems. "
+            f"{'This appears to be AI-generated code, which may have introduced this vulnerability.' if is_copilot else ''}",
+            "Use environment variables or a secrets manager (e.g., AWS Secrets Manager, HashiCorp Vault)"
+        )
     
-    def _check_unsafe_patterns(self, file_path: str, lines: List[str], is_copilot: bool) -> List[Violation]:
-        """Check for unsafe execution patterns"""
-        violations = []
-        for line_num, line in enumerate(lines, 1):
-            for pattern_config in self.unsafe_patterns:
-                if re.search(pattern_config["pattern"], line):
-                    violation = Violation(
-                        rule_id=pattern_config["rule_id"],
-                        rule_name=pattern_config["rule_name"],
-                        category=pattern_config["category"],
-                        severity=pattern_config["severity"],
-                        file_path=file_path,
-                        line_number=line_num,
-                        message=f"Unsafe operation detected: {pattern_config['rule_name']}",
-                        explanation=f"The use of {pattern_config['rule_name'].lower()} can lead to code injection vulnerabilities. "
-                                   f"Only use when absolutely necessary and with proper input validation. "
-                                   f"{'AI-generated code may not have considered the security implications.' if is_copilot else ''}",
-                        fix_suggestion="Use safer alternatives or implement strict input validation and sandboxing",
-                        standard_mappings=pattern_config["standard_mappings"],
-                        code_snippet=line.strip(),
-                        is_copilot_generated=is_copilot
-                    )
-                    violations.append(violation)
-        return violations
+    @staticmethod
+    def _sql_injection_texts(pattern_config: Dict[str, Any], is_copilot: bool) -> Tuple[str, str, str]:
+        """Message, explanation and fix suggestion for a SQL injection pattern"""
+        return (
+            "Potential SQL injection vulnerability detected",
+            f"SQL queries constructed using string concatenation or formatting are vulnerable to SQL injection attacks. "
+            f"Use parameterized queries or ORM methods instead. "
+            f"{'This AI-generated code may not have considered security best practices.' if is_copilot else ''}",
+            "Use parameterized queries: cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))"
+        )
+    
+    @staticmethod
+    def _unsafe_texts(pattern_config: Dict[str, Any], is_copilot: bool) -> Tuple[str, str, str]:
+        """Message, explanation and fix suggestion for an unsafe execution pattern"""
+        return (
+            f"Unsafe operation detected: {pattern_config['rule_name']}",
+            f"The use of {pattern_config['rule_name'].lower()} can lead to code injection vulnerabilities. "
+            f"Only use when absolutely necessary and with proper input validation. "
+            f"{'AI-generated code may not have considered the security implications.' if is_copilot else ''}",
+            "Use safer alternatives or implement strict input validation and sandboxing"
+        )
+    
+    def _secret_violation(
+        self, pattern_config: Dict[str, Any], file_path: str, line_num: int, line: str, column: int, is_copilot: bool
+    ) -> Violation:
+        """Violation for a hardcoded secret"""
+        message, explanation, fix_suggestion = pattern_config["texts"][is_copilot]
+        return Violation(
+            rule_id=pattern_config["rule_id"],
+            rule_name=pattern_config["rule_name"],
+            category=pattern_config["category"],
+            severity=pattern_config["severity"],
+            file_path=file_path,
+            line_number=line_num,
+            column_number=column + 1,
+            message=message,
+            explanation=explanation,
+            fix_suggestion=fix_suggestion,
+            standard_mappings=pattern_config["standard_mappings"],
+            code_snippet=line.strip(),
+            is_copilot_generated=is_copilot
+        )
+    
+    def _sql_injection_violation(
+        self, pattern_config: Dict[str, Any], file_path: str, line_num: int, line: str, is_copilot: bool
+    ) -> Violation:
+        """Violation for a SQL injection pattern"""
+        message, explanation, fix_suggestion = pattern_config["texts"][is_copilot]
+        return Violation(
+            rule_id=pattern_config["rule_id"],
+            rule_name=pattern_config["rule_name"],
+            category=pattern_config["category"],
+            severity=pattern_config["severity"],
+            file_path=file_path,
+            line_number=line_num,
+            message=message,
+            explanation=explanation,
+            fix_suggestion=fix_suggestion,
+            standard_mappings=pattern_config["standard_mappings"],
+            code_snippet=line.strip(),
+            is_copilot_generated=is_copilot
+        )
+    
+    def _unsafe_violation(
+        self, pattern_config: Dict[str, Any], file_path: str, line_num: int, line: str, is_copilot: bool
+    ) -> Violation:
+        """Violation for an unsafe execution pattern"""
+        message, explanation, fix_suggestion = pattern_config["texts"][is_copilot]
+        return Violation(
+            rule_id=pattern_config["rule_id"],
+            rule_name=pattern_config["rule_name"],
+            category=pattern_config["category"],
+            severity=pattern_config["severity"],
+            file_path=file_path,
+            line_number=line_num,
+            message=message,
+            explanation=explanation,
+            fix_suggestion=fix_suggestion,
+            standard_mappings=pattern_config["standard_mappings"],
+            code_snippet=line.strip(),
+            is_copilot_generated=is_copilot
+        )
@@ -10,7 +10,8 @@ from contextlib import asynccontextmanager
 # Import modules - use absolute imports when running from backend directory
 from api import scan, policies, audit, dashboard
 from core.config import settings
-from core.logging_config import setup_logging
+from core.dependencies import get_audit_logger, get_code_scanner
+from core.logging_config import setup_logging, shutdown_logging
 
 # Setup logging
 setup_logging()
@@ -23,6 +24,12 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Enterprise Guardrails Service...")
     yield
     logger.info("Shutting down Enterprise Guardrails Service...")
+    # Close only services that were built; the getters would create them otherwise
+    if get_audit_logger.cache_info().currsize:
+        await get_audit_logger().close()
+    if get_code_scanner.cache_info().currsize:
+        await get_code_scanner().close()
+    shutdown_logging()
 
 
 app = FastAPI(
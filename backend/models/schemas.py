@@ -21,6 +21,14 @@ class Severity(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+    @property
+    def rank(self) -> int:
+        """Ordinal for threshold comparisons, LOW=0 through CRITICAL=3"""
+        return _SEVERITY_RANKS[self]
+
+
+_SEVERITY_RANKS = {severity: rank for rank, severity in enumerate(Severity)}
+
 
 class ViolationCategory(str, Enum):
     """Violation categories"""
@@ -104,3 +112,10 @@ class AuditLog(BaseModel):
     violations_count: int
     enforcement_action: EnforcementMode
     resolved: bool = False
+
+
+class AuditLogExport(BaseModel):
+    """JSON audit log export"""
+    format: str = "json"
+    count: int
+    logs: List[AuditLog]
@@ -0,0 +1,175 @@
+"""
+AIAnalyzer behaviour that needs no network: local scoring, caching, parsing
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from core.config import settings
+from engines import ai_analyzer
+from engines.ai_analyzer import AIAnalyzer, COPILOT_SCORE_HIGH, COPILOT_SCORE_LOW, _copilot_score, _extract_json
+from engines.ai_cache import AICache
+from models.schemas import Severity, Violation, ViolationCategory
+
+DOCUMENTED = '''
+def calculate_total_price(items_in_cart, discount_percentage):
+    """Calculate the total price of all items after the discount"""
+    # Sum every item price before applying the discount
+    subtotal_amount = sum(item.price for item in items_in_cart)
+    # Apply the discount as a percentage of the subtotal
+    return subtotal_amount * (1 - discount_percentage / 100)
+'''
+
+
+@pytest.fixture
+def analyzer(monkeypatch, tmp_path):
+    """An enabled analyzer whose Gemini calls are recorded instead of sent"""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_CACHE_PATH", "")
+    analyzer = AIAnalyzer()
+    analyzer.cache = AICache(str(tmp_path / "ai_cache.db"))
+    analyzer.prompts = []
+    
+    async def call_gemini(prompt):
+        analyzer.prompts.append(prompt)
+        return analyzer.reply
+    
+    analyzer.reply = "true"
+    analyzer._call_gemini = call_gemini
+    return analyzer
+
+
+def test_copilot_score_settles_markers_and_trivial_input():
+    assert _copilot_score("# Generated by GitHub Copilot\nx = 1\n") == 1.0
+    assert _copilot_score("x = 1") == 0.0
+    assert _copilot_score("x" * 100 + "\x00") == 0.0
+
+
+def test_copilot_score_leaves_only_ambiguous_code_for_gemini():
+    terse = "def f(a,b):\n  c=a+b\n  d=c*2\n  e=d-a\n  return e\n" * 3
+    assert COPILOT_SCORE_LOW < _copilot_score(DOCUMENTED) < COPILOT_SCORE_HIGH
+    assert _copilot_score(terse) <= COPILOT_SCORE_LOW
+
+
+def test_detect_copilot_code_caches_gemini_answers(analyzer):
+    assert asyncio.run(analyzer.detect_copilot_code(DOCUMENTED)) is True
+    assert asyncio.run(analyzer.detect_copilot_code(DOCUMENTED)) is True
+    assert len(analyzer.prompts) == 1
+
+
+def test_detect_copilot_code_skips_gemini_for_clear_cut_code(analyzer):
+    assert asyncio.run(analyzer.detect_copilot_code("# copilot suggestion\n" + DOCUMENTED)) is True
+    assert asyncio.run(analyzer.detect_copilot_code("x = 1")) is False
+    assert analyzer.prompts == []
+
+
+def _violation():
+    return Violation(
+        rule_id="SEC201", rule_name="Unsafe eval", category=ViolationCategory.SECURITY,
+        severity=Severity.HIGH, file_path="a.py", line_number=3,
+        message="eval on input", explanation="eval runs arbitrary code"
+    )
+
+
+def test_suggest_fix_unwraps_fenced_code_and_caches_it(analyzer):
+    analyzer.reply = "Here you go:\n```python\nvalue = ast.literal_eval(data)\n```\nDone."
+    assert asyncio.run(analyzer.suggest_fix(_violation(), "value = eval(data)")) == "value = ast.literal_eval(data)"
+    assert asyncio.run(analyzer.suggest_fix(_violation(), "value = eval(data)")) == "value = ast.literal_eval(data)"
+    assert len(analyzer.prompts) == 1
+
+
+def test_suggest_fix_keeps_unfenced_replies(analyzer):
+    analyzer.reply = "  value = int(data)  \n"
+    assert asyncio.run(analyzer.suggest_fix(_violation(), "value = eval(data)")) == "value = int(data)"
+
+
+GEMINI_OK = {"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """An analyzer posting to a scripted Gemini endpoint, with retry waits shrunk to milliseconds"""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_CACHE_PATH", "")
+    monkeypatch.setattr(settings, "GEMINI_TOKENS_PER_MINUTE", 1_000_000)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_RETRY_BUDGET_SECONDS", 0.2)
+    analyzer = AIAnalyzer()
+    analyzer.responses = []
+    analyzer.attempts = 0
+    
+    def handler(request):
+        analyzer.attempts += 1
+        if analyzer.responses:
+            return analyzer.responses.pop(0)
+        return httpx.Response(503)
+    
+    analyzer._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return analyzer
+
+
+def _post(analyzer, prompt="x" * 400):
+    async def post():
+        try:
+            return await analyzer._post_gemini(prompt)
+        finally:
+            await analyzer.close()
+    return asyncio.run(post())
+
+
+def test_retried_call_reserves_the_token_budget_once(gemini):
+    gemini.responses = [httpx.Response(503), httpx.Response(503), httpx.Response(200, json=GEMINI_OK)]
+    assert _post(gemini) == "ok"
+    assert gemini.attempts == 3
+    assert gemini._token_budget._used == 100
+
+
+def test_retries_stop_at_the_retry_budget(gemini):
+    started = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        _post(gemini)
+    assert time.monotonic() - started < 1.0
+    assert 1 < gemini.attempts < ai_analyzer.GEMINI_MAX_RETRIES + 1
+
+
+def test_retry_after_is_honoured(gemini):
+    gemini.responses = [httpx.Response(429, headers={"retry-after": "0.05"}), httpx.Response(200, json=GEMINI_OK)]
+    started = time.monotonic()
+    assert _post(gemini) == "ok"
+    assert time.monotonic() - started >= 0.05
+
+
+def test_retry_after_past_the_budget_pauses_calls_without_waiting(gemini):
+    gemini.responses = [httpx.Response(429, headers={"retry-after": "120"})]
+    started = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        _post(gemini)
+    assert time.monotonic() - started < 0.2
+    assert gemini.attempts == 1
+    assert not gemini._quota_ok()
+
+
+def test_retry_after_accepts_http_dates():
+    assert ai_analyzer._retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert ai_analyzer._retry_after_seconds("soon") is None
+
+
+def test_extract_json_skips_prose_around_the_value():
+    assert _extract_json('Sure:\n```json\n[{"a": 1}]\n```', '[') == [{"a": 1}]
+    assert _extract_json('{"a": [1]} and [2]', '{') == {"a": [1]}
+
+
+def test_malformed_json_is_rejected_whole(caplog):
+    assert _extract_json('[{"a": 1}, {"a": 2,}]', '[') is None
+    assert "malformed JSON" in caplog.text
+
+
+def test_truncated_reply_keeps_its_complete_items(gemini):
+    cut = '[{"a": 1}, {"a": 2}, {"a": 3'
+    gemini.responses = [httpx.Response(200, json={
+        "candidates": [{"content": {"parts": [{"text": cut}]}, "finishReason": "MAX_TOKENS"}]
+    })]
+    assert _extract_json(_post(gemini), '[') == [{"a": 1}, {"a": 2}]
+    assert _extract_json(cut, '[') is None
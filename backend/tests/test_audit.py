@@ -0,0 +1,66 @@
+"""
+AuditLogger's background write queue, with a JSONL file as storage
+"""
+import asyncio
+import json
+
+import pytest
+
+from core.audit import AuditLogger
+from core.config import settings
+from models.schemas import EnforcementMode, ScanRequest, ScanResult
+
+
+def _scan(index: int):
+    result = ScanResult(
+        scan_id=f"scan-{index}", repository="test/repo", enforcement_action=EnforcementMode.ADVISORY,
+        can_merge=True, processing_time_ms=1.0
+    )
+    return result, ScanRequest(repository="test/repo", files=[])
+
+
+@pytest.fixture
+def log_file(monkeypatch, tmp_path):
+    path = tmp_path / "audit_logs.jsonl"
+    monkeypatch.setattr(settings, "AUDIT_DATABASE_URL", "")
+    monkeypatch.setattr(settings, "AUDIT_LOG_FILE", str(path))
+    return path
+
+
+def _written_scan_ids(log_file):
+    return [json.loads(line)["details"]["scan_id"] for line in log_file.read_text().splitlines()]
+
+
+def test_queued_entries_are_written_in_order(log_file):
+    async def run():
+        audit_logger = AuditLogger()
+        for index in range(5):
+            await audit_logger.log_scan(*_scan(index))
+        await audit_logger.close()
+
+    asyncio.run(run())
+    assert _written_scan_ids(log_file) == [f"scan-{index}" for index in range(5)]
+
+
+def test_restarted_flusher_keeps_entries_queued_before_it_stopped(log_file):
+    async def run():
+        audit_logger = AuditLogger()
+        await audit_logger.log_scan(*_scan(0))
+        # The flusher dies before it ever ran, leaving scan-0 in the queue
+        audit_logger._flush_task.cancel()
+        await asyncio.sleep(0)
+        await audit_logger.log_scan(*_scan(1))
+        await audit_logger.close()
+
+    asyncio.run(run())
+    assert _written_scan_ids(log_file) == ["scan-0", "scan-1"]
+
+
+def test_logs_reload_from_the_file(log_file):
+    async def write():
+        audit_logger = AuditLogger()
+        await audit_logger.log_scan(*_scan(0))
+        await audit_logger.close()
+
+    asyncio.run(write())
+    assert [log.details["scan_id"] for log in AuditLogger().logs] == ["scan-0"]
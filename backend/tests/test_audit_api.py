@@ -0,0 +1,36 @@
+"""
+Audit export endpoint, served from an in-memory AuditLogger
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import audit
+from core.audit import AuditLogger
+from core.config import settings
+from core.dependencies import get_audit_logger
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_DATABASE_URL", "")
+    monkeypatch.setattr(settings, "AUDIT_LOG_FILE", "")
+    app = FastAPI()
+    app.include_router(audit.router, prefix="/api/v1/audit")
+    audit_logger = AuditLogger()
+    app.dependency_overrides[get_audit_logger] = lambda: audit_logger
+    return TestClient(app)
+
+
+def test_export_documents_both_formats(client):
+    content = client.get("/openapi.json").json()["paths"]["/api/v1/audit/logs/export"]["get"]["responses"]["200"]["content"]
+    assert content["application/json"]["schema"] == {"$ref": "#/components/schemas/AuditLogExport"}
+    assert content["text/csv"]["schema"] == {"type": "string"}
+
+
+def test_export_serves_each_format_with_its_media_type(client):
+    json_export = client.get("/api/v1/audit/logs/export")
+    assert json_export.headers["content-type"] == "application/json"
+    assert json_export.json()["logs"] == []
+    csv_export = client.get("/api/v1/audit/logs/export", params={"format": "csv"})
+    assert csv_export.headers["content-type"].startswith("text/csv")
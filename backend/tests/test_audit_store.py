@@ -0,0 +1,108 @@
+"""
+SQLAuditStore against a throwaway SQLite file
+"""
+import asyncio
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.audit_store import SQLAuditStore
+from models.schemas import AuditLog, EnforcementMode
+
+NOW = datetime(2026, 1, 15, 12, 0, 0)
+
+
+def _log(index: int, copilot: bool = False, **overrides) -> AuditLog:
+    fields = dict(
+        log_id=f"log-{index}",
+        timestamp=NOW - timedelta(hours=index),
+        repository="test/repo",
+        action="scan",
+        user=None,
+        details={"copilot_detected": copilot},
+        violations_count=index,
+        enforcement_action=EnforcementMode.ADVISORY,
+    )
+    fields.update(overrides)
+    return AuditLog(**fields)
+
+
+def _run(store: SQLAuditStore, coroutine):
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await store.close()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "audit.db"
+
+
+def test_aggregate_reads_tables_created_before_copilot_detected(db_path):
+    # audit_logs as the first SQL store release created it, with one stored scan
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE audit_logs (log_id VARCHAR(36) PRIMARY KEY, timestamp DATETIME, "
+            "repository VARCHAR(255), action VARCHAR(32), user VARCHAR(255), details JSON, "
+            "violations_count INTEGER, enforcement_action VARCHAR(16), resolved BOOLEAN)"
+        )
+        conn.execute(
+            "INSERT INTO audit_logs VALUES ('old-1', ?, 'test/repo', 'scan', NULL, ?, 3, 'advisory', 0)",
+            (str(NOW), json.dumps({"copilot_detected": True}))
+        )
+        conn.execute(
+            "INSERT INTO audit_logs VALUES ('old-2', ?, 'test/repo', 'scan', NULL, ?, 2, 'advisory', 0)",
+            (str(NOW), json.dumps({}))
+        )
+
+    store = SQLAuditStore(f"sqlite+aiosqlite:///{db_path}")
+
+    async def add_and_aggregate():
+        await store.add(_log(1, copilot=True))
+        return await store.aggregate(repository="test/repo")
+
+    rows = _run(store, add_and_aggregate())
+    assert rows == [{
+        "enforcement_action": "advisory", "scans": 3, "violations": 6,
+        "copilot_scans": 2, "copilot_violations": 4, "resolved": 0
+    }]
+
+
+def test_query_filters_orders_and_limits_in_the_database(db_path):
+    store = SQLAuditStore(f"sqlite+aiosqlite:///{db_path}")
+    logs = [_log(index) for index in range(6)] + [_log(6, repository="other/repo")]
+
+    async def add_and_query():
+        await store.add_many(logs)
+        return (
+            await store.query(repository="test/repo", limit=3),
+            await store.query(start_date=NOW - timedelta(hours=4), end_date=NOW - timedelta(hours=2)),
+            [log async for log in store.stream(repository="other/repo")],
+        )
+
+    newest, in_range, streamed = _run(store, add_and_query())
+    assert [log.log_id for log in newest] == ["log-0", "log-1", "log-2"]
+    assert [log.log_id for log in in_range] == ["log-2", "log-3", "log-4"]
+    assert [log.log_id for log in streamed] == ["log-6"]
+    assert newest[0].details == {"copilot_detected": False}
+    assert newest[0].enforcement_action is EnforcementMode.ADVISORY
+
+
+def test_daily_stats_accumulate_across_writes(db_path):
+    store = SQLAuditStore(f"sqlite+aiosqlite:///{db_path}")
+
+    async def add_and_read():
+        await store.add(_log(0, copilot=True))
+        await store.add_many([_log(1), _log(30, resolved=True)])
+        return await store.query_daily_stats(repository="test/repo")
+
+    rows = sorted(_run(store, add_and_read()), key=lambda row: row["day"])
+    assert [(row["day"], row["scans"], row["violations"], row["copilot_scans"], row["resolved"]) for row in rows] == [
+        ((NOW - timedelta(hours=30)).date(), 1, 30, 0, 1),
+        (NOW.date(), 2, 1, 1, 0),
+    ]
@@ -0,0 +1,59 @@
+"""
+DashboardService figures over an in-memory AuditLogger
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from core.audit import AuditLogger
+from core.config import settings
+from core.dashboard import DashboardService
+from models.schemas import AuditLog, EnforcementMode
+
+START = datetime(2026, 1, 10, 12, 0, 0)
+END = datetime(2026, 1, 12, 12, 0, 0)
+
+
+def _log(index: int, timestamp: datetime, violations: int = 1) -> AuditLog:
+    return AuditLog(
+        log_id=f"log-{index}", timestamp=timestamp, repository="test/repo", action="scan", user=None,
+        details={"copilot_detected": False}, violations_count=violations,
+        enforcement_action=EnforcementMode.ADVISORY
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_DATABASE_URL", "")
+    monkeypatch.setattr(settings, "AUDIT_LOG_FILE", "")
+    monkeypatch.setattr(DashboardService, "_trend_window", staticmethod(lambda days: (START, END)))
+    audit_logger = AuditLogger()
+    for index, (timestamp, violations) in enumerate([
+        (datetime(2026, 1, 10, 8, 0), 5),
+        (datetime(2026, 1, 10, 13, 0), 2),
+        (datetime(2026, 1, 11, 9, 30), 3),
+        (datetime(2026, 1, 12, 10, 0), 1),
+    ]):
+        audit_logger._index_log(_log(index, timestamp, violations))
+    return DashboardService(audit_logger)
+
+
+EXPECTED_TRENDS = {
+    "period_days": 2,
+    "daily_trends": [
+        {"date": "2026-01-12", "scans": 1, "violations": 1},
+        {"date": "2026-01-11", "scans": 1, "violations": 3},
+        {"date": "2026-01-10", "scans": 1, "violations": 2},
+    ]
+}
+
+
+def test_trends_start_at_the_cutoff_time_not_the_whole_day(service):
+    assert asyncio.run(service.get_violation_trends(repository="test/repo", days=2)) == EXPECTED_TRENDS
+
+
+def test_bundle_trends_match_the_trends_endpoint(service):
+    bundle = asyncio.run(service.get_dashboard_bundle(repository="test/repo", days=2))
+    assert bundle["trends"] == EXPECTED_TRENDS
+    assert bundle["stats"]["total_scans"] == 4
@@ -0,0 +1,95 @@
+"""
+Dashboard response caching: the TTL cache and ETag / 304 handling
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import dashboard
+from core.dashboard_cache import TTLCache
+from core.dependencies import get_dashboard_service
+
+
+class CountingService:
+    """Stands in for DashboardService, counting how often stats are computed"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_scans = 1
+
+    async def get_stats(self, repository=None, start_date=None, end_date=None):
+        self.calls += 1
+        return {"total_scans": self.total_scans}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TTLCache(maxsize=8, ttl=60.0)
+    monkeypatch.setattr(dashboard, "dashboard_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def service():
+    return CountingService()
+
+
+@pytest.fixture
+def client(cache, service):
+    app = FastAPI()
+    app.include_router(dashboard.router, prefix="/api/v1/dashboard")
+    app.dependency_overrides[get_dashboard_service] = lambda: service
+    return TestClient(app)
+
+
+def test_cache_expires_entries_after_the_ttl():
+    cache = TTLCache(ttl=0.01)
+    cache.set(("stats", None), 1)
+    assert cache.get(("stats", None)) == 1
+    time.sleep(0.02)
+    assert cache.get(("stats", None)) is None
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    cache = TTLCache(maxsize=2)
+    cache.set(("stats", "a"), 1)
+    cache.set(("stats", "b"), 2)
+    cache.get(("stats", "a"))
+    cache.set(("stats", "c"), 3)
+    assert cache.get(("stats", "b")) is None
+    assert cache.get(("stats", "a")) == 1
+
+
+def test_invalidate_drops_the_repository_and_cross_repository_entries():
+    cache = TTLCache()
+    for repository in ("a", "b", None):
+        cache.set(("stats", repository), repository)
+    cache.invalidate("a")
+    assert [cache.get(("stats", repository)) for repository in ("a", "b", None)] == [None, "b", None]
+
+
+def test_repeat_polls_are_served_from_the_cache(client, service):
+    first = client.get("/api/v1/dashboard/stats", params={"repository": "test/repo"})
+    second = client.get("/api/v1/dashboard/stats", params={"repository": "test/repo"})
+    assert first.json() == second.json() == {"total_scans": 1}
+    assert service.calls == 1
+
+
+def test_matching_etag_gets_an_empty_304(client):
+    etag = client.get("/api/v1/dashboard/stats").headers["etag"]
+    not_modified = client.get("/api/v1/dashboard/stats", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_new_data_changes_the_etag(client, cache, service):
+    etag = client.get("/api/v1/dashboard/stats").headers["etag"]
+    service.total_scans = 2
+    cache.invalidate("test/repo")
+    refreshed = client.get("/api/v1/dashboard/stats", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json() == {"total_scans": 2}
+    assert refreshed.headers["etag"] != etag
@@ -0,0 +1,22 @@
+"""
+PolicyEngine policy resolution
+"""
+from engines.policy_engine import PolicyEngine
+from models.schemas import EnforcementMode, Severity
+
+
+def test_default_policy_is_not_shared_between_callers(tmp_path):
+    engine = PolicyEngine(config_path=str(tmp_path))
+    policy = engine.get_policy("test/repo")
+    policy.disabled_rules.append("SEC001")
+    policy.enforcement_mode = EnforcementMode.BLOCKING
+
+    fresh = engine.get_policy("other/repo")
+    assert fresh.disabled_rules == []
+    assert fresh.enforcement_mode == EnforcementMode.WARNING
+
+
+def test_overrides_apply_per_request(tmp_path):
+    engine = PolicyEngine(config_path=str(tmp_path))
+    assert engine.get_policy("test/repo", {"severity_threshold": "high"}).severity_threshold == "high"
+    assert engine.get_policy("test/repo").severity_threshold == Severity.MEDIUM
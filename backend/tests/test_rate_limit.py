@@ -0,0 +1,81 @@
+"""
+Gemini admission control: the adaptive concurrency cap and the token budget
+"""
+import asyncio
+import time
+
+from engines.rate_limit import AdaptiveConcurrencyLimiter, TokenBudget
+
+
+def _peak_in_flight(limiter: AdaptiveConcurrencyLimiter, requests: int) -> int:
+    async def run():
+        in_flight = peak = 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(request() for _ in range(requests)))
+        return peak
+
+    return asyncio.run(run())
+
+
+def test_limiter_caps_requests_in_flight():
+    assert _peak_in_flight(AdaptiveConcurrencyLimiter(3), 10) == 3
+
+
+def test_limiter_halves_its_cap_after_a_rate_limit():
+    limiter = AdaptiveConcurrencyLimiter(4, cooldown_seconds=60.0)
+    limiter.reduce()
+    assert limiter.limit == 2
+    assert _peak_in_flight(limiter, 10) == 2
+
+
+def test_limiter_recovers_after_the_cooldown():
+    limiter = AdaptiveConcurrencyLimiter(4, cooldown_seconds=0.01)
+    limiter.reduce()
+    time.sleep(0.02)
+    assert limiter.limit == 4
+
+
+def test_budget_admits_requests_that_fit_without_waiting():
+    budget = TokenBudget(100, window_seconds=60.0)
+
+    async def run():
+        started = time.monotonic()
+        await budget.reserve(60)
+        await budget.reserve(40)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+    assert budget._used == 100
+
+
+def test_budget_waits_for_the_window_to_free_up():
+    budget = TokenBudget(100, window_seconds=0.05)
+
+    async def run():
+        await budget.reserve(80)
+        started = time.monotonic()
+        await budget.reserve(40)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.04
+    assert budget._used == 40
+
+
+def test_budget_lets_oversized_requests_through_an_empty_window():
+    budget = TokenBudget(100, window_seconds=60.0)
+    asyncio.run(budget.reserve(500))
+    assert budget._used == 500
+
+
+def test_zero_budget_means_unlimited():
+    budget = TokenBudget(0)
+    asyncio.run(budget.reserve(10 ** 9))
+    assert budget._used == 0
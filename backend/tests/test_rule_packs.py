@@ -0,0 +1,95 @@
+"""
+Rule packs at scan level: off unless RULE_PACK_ENFORCEMENT is set, and the
+findings each shipped pack reports when it is
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from core.config import settings
+from core.scanner import CodeScanner
+from models.schemas import ScanRequest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+SAMPLES = {
+    "banking": (
+        'company_id = expand(items)\n'
+        'card_number = "4111111111111111"\n'
+        'def process_payment(amount):\n'
+        '    """Send the payment"""\n'
+        'ssn = "123-45-6789"\n'
+        'interest_rate = 4.5\n'
+    ),
+    "government": (
+        'graphic = philosophy()\n'
+        '# NIST security controls apply\n'
+        'passport_number = read()\n'
+        'platform = "SaaS"\n'
+        'audit(page, "WCAG")\n'
+    ),
+    "healthcare": (
+        'app.route("/health")\n'
+        'patient_name = form["name"]\n'
+        'store(medical_records)\n'
+        'write(audit_trail)\n'
+        'print("loaded", patient)\n'
+    ),
+    "telecom": (
+        'window.location = url\n'
+        'export(call_detail_records)\n'
+        'subscriber_location = lookup()\n'
+        'if master_key: allow()\n'
+    ),
+}
+
+EXPECTED = {
+    "banking": [("BANK001", 2), ("BANK002", 3), ("BANK003", 5), ("BANK004", 6)],
+    "government": [("GOV001", 2), ("GOV002", 3), ("GOV003", 4), ("GOV004", 5)],
+    "healthcare": [("HIPAA001", 2), ("HIPAA002", 3), ("HIPAA003", 4), ("HIPAA004", 5)],
+    "telecom": [("TEL001", 2), ("TEL002", 3), ("TEL003", 4)],
+}
+
+
+@pytest.fixture
+def scan(monkeypatch):
+    """Scan one file under a policy, from the repository root where config/ lives"""
+    monkeypatch.chdir(REPO_ROOT)
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+    
+    def run(content, **policy_config):
+        async def scan_once():
+            scanner = CodeScanner()
+            try:
+                return await scanner.scan(ScanRequest(
+                    repository="test/repo",
+                    files=[{"path": "sample.py", "content": content}],
+                    policy_config=policy_config
+                ))
+            finally:
+                await scanner.close()
+        return asyncio.run(scan_once())
+    
+    return run
+
+
+@pytest.mark.parametrize("pack", sorted(SAMPLES))
+def test_rule_packs_report_nothing_by_default(scan, pack):
+    result = scan(SAMPLES[pack], rule_packs=[pack])
+    assert result.violations == []
+
+
+@pytest.mark.parametrize("pack", sorted(SAMPLES))
+def test_each_pack_reports_its_findings_when_enforced(scan, monkeypatch, pack):
+    monkeypatch.setattr(settings, "RULE_PACK_ENFORCEMENT", True)
+    result = scan(SAMPLES[pack], rule_packs=[pack])
+    assert [(v.rule_id, v.line_number) for v in result.violations] == EXPECTED[pack]
+
+
+def test_rule_pack_findings_follow_policy_filters(scan, monkeypatch):
+    monkeypatch.setattr(settings, "RULE_PACK_ENFORCEMENT", True)
+    disabled = scan(SAMPLES["banking"], rule_packs=["banking"], disabled_rules=["BANK001"])
+    assert "BANK001" not in {v.rule_id for v in disabled.violations}
+    critical = scan(SAMPLES["banking"], rule_packs=["banking"], severity_threshold="critical")
+    assert {v.rule_id for v in critical.violations} == {"BANK001"}
@@ -0,0 +1,145 @@
+"""
+CodeScanner orchestration: AI request sharing and batching, with Gemini faked
+"""
+import asyncio
+import gc
+import json
+import threading
+
+import pytest
+
+from core.config import settings
+from core.scanner import CodeScanner, _AnalysisBatcher
+from models.schemas import ScanRequest, Severity, Violation, ViolationCategory
+
+SMALL_FILE = "def handler(request):\n    return render(request.GET['page'])\n" * 2
+SECRET_FILE = 'password = "hunter22"\n' + SMALL_FILE
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    """A scanner with AI enabled whose Gemini prompts are recorded and answered locally"""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_CACHE_PATH", "")
+    scanner = CodeScanner()
+    scanner.prompts = []
+
+    async def call_gemini(prompt):
+        scanner.prompts.append(prompt)
+        violation = {"rule_id": "AI001", "line_number": 2, "message": "unescaped output"}
+        if "COMBINED OUTPUT FORMAT" in prompt:
+            fixes = [{"index": i, "fix": f"fix {i}"} for i in range(1, prompt.count("Violation ") + 1)]
+            return json.dumps({"violations": [violation], "fixes": fixes})
+        if "=== FILE 1:" in prompt:
+            return json.dumps([dict(violation, file_index=0), dict(violation, file_index=1)])
+        return json.dumps([violation])
+
+    scanner.ai_analyzer._call_gemini = call_gemini
+    return scanner
+
+
+def _scan(scanner, files):
+    async def scan_once():
+        try:
+            return await scanner.scan(ScanRequest(repository="test/repo", files=files))
+        finally:
+            await scanner.close()
+    return asyncio.run(scan_once())
+
+
+def test_batcher_holds_its_tasks_until_they_finish():
+    async def run():
+        release = asyncio.Event()
+
+        async def submit(files):
+            await release.wait()
+            return [[] for _ in files]
+
+        batcher = _AnalysisBatcher(submit)
+        pending = asyncio.ensure_future(batcher.analyze("a.py", "x = 1", {}, False))
+        await asyncio.sleep(0)
+        batcher._flush()
+        gc.collect()
+        assert len(batcher._tasks) == 1
+        release.set()
+        assert await pending == ([], [])
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+
+    asyncio.run(run())
+
+
+def test_small_files_share_one_batched_request(scanner):
+    result = _scan(scanner, [
+        {"path": "a.py", "content": SMALL_FILE},
+        {"path": "b.py", "content": SMALL_FILE + "\n"},
+    ])
+    assert len(scanner.prompts) == 1 and "=== FILE 1:" in scanner.prompts[0]
+    assert sorted(v.file_path for v in result.violations if v.rule_id == "AI001") == ["a.py", "b.py"]
+
+
+def test_duplicate_files_share_the_batched_result(scanner):
+    result = _scan(scanner, [
+        {"path": "a.py", "content": SMALL_FILE},
+        {"path": "b.py", "content": SMALL_FILE},
+    ])
+    assert len(scanner.prompts) == 1
+    assert sorted(v.file_path for v in result.violations if v.rule_id == "AI001") == ["a.py", "b.py"]
+
+
+def test_duplicate_files_each_get_their_own_fixes(scanner, monkeypatch):
+    monkeypatch.setattr(settings, "AI_FIX_SUGGESTIONS", True)
+    result = _scan(scanner, [
+        {"path": "a.py", "content": SECRET_FILE},
+        {"path": "b.py", "content": SECRET_FILE},
+    ])
+    assert len(scanner.prompts) == 1
+    secrets = [v for v in result.violations if v.rule_id == "SEC002"]
+    assert sorted(v.file_path for v in secrets) == ["a.py", "b.py"]
+    assert [v.fix_suggestion for v in secrets] == ["fix 1", "fix 1"]
+
+
+def test_ai_failure_keeps_static_and_license_results(scanner, monkeypatch):
+    async def failing_ai_pass(*args, **kwargs):
+        raise RuntimeError("AI backend exploded")
+
+    license_violation = Violation(
+        rule_id="LIC001", rule_name="Restricted License Detected", category=ViolationCategory.LICENSE,
+        severity=Severity.HIGH, file_path="a.py", line_number=1, message="GPL", explanation="GPL"
+    )
+    monkeypatch.setattr(scanner, "_ai_pass", failing_ai_pass)
+    monkeypatch.setattr(scanner.license_checker, "check_file", lambda file_path, content: [license_violation])
+    result = _scan(scanner, [{"path": "a.py", "content": SECRET_FILE}])
+    assert {v.rule_id for v in result.violations} == {"SEC002", "LIC001"}
+
+
+def test_one_failing_file_does_not_abort_the_scan(scanner, monkeypatch):
+    scan_file = scanner._scan_file
+
+    async def flaky_scan_file(file_data, *args):
+        if file_data["path"] == "bad.py":
+            raise RuntimeError("unexpected failure")
+        return await scan_file(file_data, *args)
+
+    monkeypatch.setattr(scanner, "_scan_file", flaky_scan_file)
+    result = _scan(scanner, [
+        {"path": "bad.py", "content": SECRET_FILE},
+        {"path": "good.py", "content": SECRET_FILE},
+    ])
+    assert {v.file_path for v in result.violations if v.rule_id == "SEC002"} == {"good.py"}
+
+
+def test_close_waits_for_worker_processes_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_PROCESS_WORKERS", 1)
+    scanner = CodeScanner()
+    pool = scanner._process_pool
+    shutdown = pool.shutdown
+    loop_threads = []
+
+    def recording_shutdown(*args, **kwargs):
+        loop_threads.append(threading.current_thread() is threading.main_thread())
+        shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(pool, "shutdown", recording_shutdown)
+    asyncio.run(scanner.close())
+    assert loop_threads == [False]